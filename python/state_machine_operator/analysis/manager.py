@@ -182,64 +182,65 @@ class WorkflowTimesParser:
 
     def add_experiment(self, times_file, experiment="default", iteration=0):
         """
-        Helper function to parse a workflow-times.json file
-        and return a pandas data frame. An experiment name
-        and iteration are suggested.
+        Helper function to parse a workflow-times.json file (or a
+        workflow-events.jsonl event log) and return a pandas data frame.
+        An experiment name and iteration are suggested.
+
+        Timestamps are read in order, and a job is added when we see it end,
+        so we only keep the start for jobs that have not ended yet. For a job
+        with more than one start or end (e.g., a repeat), we use the first.
         """
-        times = utils.read_json(times_file)
         self.update_times_inventory(experiment, iteration)
-
-        for name, timestamp in times["timestamps"].items():
-            if "workflow_start" in name:
-                self.workflow_starts[experiment][iteration] = timestamp
-                workflow_end = times["timestamps"]["workflow_complete"]
-                self.workflow_ends[experiment][iteration] = workflow_end
-                duration = workflow_end - timestamp
-                self.df.loc[self.idx, :] = [
-                    experiment,
-                    None,
-                    name,
-                    duration,
-                    "workflow_complete",
-                    iteration,
-                ]
-                self.idx += 1
+        starts = {}
+        ended = set()
+        workflow_start = None
+        workflow_end = None
+
+        for name, timestamp in iter_timestamps(times_file):
+            if name == "workflow_start":
+                workflow_start = workflow_start or timestamp
+                continue
+            if name == "workflow_complete":
+                workflow_end = workflow_end or timestamp
                 continue
 
             # Everything else should be a structure event, and we derive
             # other events (succeeded, failed) from the start
-            if "_start" not in name:
+            event, _, outcome = name.rpartition("_")
+            if event in ended:
+                continue
+            if outcome == "start":
+                starts.setdefault(event, timestamp)
                 continue
 
-            event = name.replace("_start", "")
+            # The job will either have failed or succeeded
+            if event not in starts or outcome not in ["succeeded", "failed"]:
+                continue
             jobid, step_name = event.rsplit("_", 1)
+            self.df.loc[self.idx, :] = [
+                experiment,
+                jobid,
+                step_name,
+                timestamp - starts.pop(event),
+                f"{step_name}_success" if outcome == "succeeded" else f"{step_name}_failure",
+                iteration,
+            ]
+            ended.add(event)
+            self.idx += 1
 
-            # The job will either have failed or succeeded
-            success_ts = f"{event}_succeeded"
-            failure_ts = f"{event}_failed"
-            if success_ts in times["timestamps"]:
-                duration = times["timestamps"][success_ts] - timestamp
-                self.df.loc[self.idx, :] = [
-                    experiment,
-                    jobid,
-                    step_name,
-                    duration,
-                    f"{step_name}_success",
-                    iteration,
-                ]
-                self.idx += 1
-
-            elif failure_ts in times["timestamps"]:
-                duration = times["timestamps"][failure_ts] - timestamp
-                self.df.loc[self.idx, :] = [
-                    experiment,
-                    jobid,
-                    step_name,
-                    duration,
-                    f"{step_name}_failure",
-                    iteration,
-                ]
-                self.idx += 1
+        if workflow_start is not None:
+            self.workflow_starts[experiment][iteration] = workflow_start
+        if workflow_start is not None and workflow_end is not None:
+            self.workflow_ends[experiment][iteration] = workflow_end
+            self.df.loc[self.idx, :] = [
+                experiment,
+                None,
+                "workflow_start",
+                workflow_end - workflow_start,
+                "workflow_complete",
+                iteration,
+            ]
+            self.idx += 1
 
     def update_times_inventory(self, experiment, iteration):
         """
@@ -254,3 +255,16 @@ class WorkflowTimesParser:
             self.workflow_starts[experiment][iteration] = {}
         if iteration not in self.workflow_ends[experiment]:
             self.workflow_ends[experiment][iteration] = {}
+
+
+def iter_timestamps(times_file):
+    """
+    Iterate over (name, timestamp) from a workflow-times.json file, or streaming
+    from a workflow-events.jsonl event log.
+    """
+    if times_file.endswith(".jsonl"):
+        for event in utils.read_jsonl(times_file):
+            if event.get("event") == "timestamp":
+                yield event["name"], event["timestamp"]
+        return
+    yield from utils.read_json(times_file)["timestamps"].items()
@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 
 import jsonschema
@@ -67,22 +68,33 @@ class WorkflowConfig:
 
     def load_events(self):
         """
-        Load and validate workflow
+        Load and validate workflow events.
+
+        Rules are compiled once here, and indexed by step name and action class
+        (state-machine or workflow), so an event only checks rules for its step.
         """
         events = self.cfg["workflow"].get("events")
-        self.rules = {}
+        self.rules = []
+        self.rule_index = {}
         if not events:
             return
 
         for event in events:
             rule = types.Rule(event)
+            self.rules.append(rule)
 
-            # Group rules based on metrics
-            if rule.action.metric not in self.rules:
-                self.rules[rule.action.metric] = []
+            # A compound rule is checked for each step it has a condition for
+            for step_name in rule.steps:
+                key = (step_name, rule.action_class)
+                if key not in self.rule_index:
+                    self.rule_index[key] = []
+                self.rule_index[key].append(rule)
 
-            # Rules are removed when they are performed
-            self.rules[rule.action.metric].append(rule)
+    def get_rules(self, step_name, action_class):
+        """
+        Get rules to check for a step and action class.
+        """
+        return self.rule_index.get((step_name, action_class), [])
 
     def get(self, name, default=None):
         return self.cfg.get(name, default)
@@ -126,6 +138,22 @@ class WorkflowConfig:
     def prefix(self):
         return self.cfg["workflow"].get("prefix")
 
+    @property
+    def label(self):
+        """
+        A label value to scope jobs to this workflow.
+
+        Unless set in the workflow config, this is the prefix. It must not
+        change with other edits to the config, or a restarted manager would
+        not find jobs that are in flight. Two workflows in a namespace with
+        the same prefix should set a different label. Label values must be
+        alphanumeric at the start and end, and can only include dashes,
+        underscores, and periods otherwise.
+        """
+        label = self.cfg["workflow"].get("label") or self.prefix or defaults.prefix
+        label = re.sub("[^A-Za-z0-9_.-]", "-", label)[:63]
+        return label.strip("_.-") or "state-machine"
+
     def set_filesystem(self, path):
         """
         Set a filesystem path in the workflow
@@ -186,6 +214,136 @@ class WorkflowConfig:
     def max_size(self):
         return self.cfg.get("cluster", {}).get("max_size")
 
+    @property
+    def reconcile_seconds(self):
+        """
+        Seconds between reconciling the manager job index with the cluster.
+        """
+        return self.cfg.get("manager", {}).get("reconcile_seconds") or defaults.reconcile_seconds
+
+    @property
+    def submit_workers(self):
+        """
+        Maximum concurrent submissions for a batch of new job sequences.
+        """
+        return int(self.cfg.get("manager", {}).get("submit_workers") or defaults.submit_workers)
+
+    @property
+    def submit_window(self):
+        """
+        Maximum submissions in flight, for trackers that submit asynchronously.
+        """
+        return int(self.cfg.get("manager", {}).get("submit_window") or defaults.submit_window)
+
+    @property
+    def flux_instances(self):
+        """
+        Number of child Flux instances to spread jobs across (0 is none).
+        """
+        return int(self.cfg.get("manager", {}).get("flux_instances") or defaults.flux_instances)
+
+    @property
+    def flux_instance_nodes(self):
+        """
+        Nodes for each child Flux instance.
+        """
+        return int(
+            self.cfg.get("manager", {}).get("flux_instance_nodes") or defaults.flux_instance_nodes
+        )
+
+    @property
+    def resource_refresh_seconds(self):
+        """
+        Seconds between refresh of free resources, for trackers that support it.
+        """
+        return (
+            self.cfg.get("manager", {}).get("resource_refresh_seconds")
+            or defaults.resource_refresh_seconds
+        )
+
+    @property
+    def event_workers(self):
+        """
+        Maximum concurrent event handlers (asyncio mode).
+        """
+        return int(self.cfg.get("manager", {}).get("event_workers") or defaults.event_workers)
+
+    @property
+    def metrics_mode(self):
+        """
+        Metrics mode: full (all models) or lazy (only models rules and summaries need).
+        """
+        return self.cfg.get("manager", {}).get("metrics_mode") or defaults.metrics_mode
+
+    @property
+    def summary_models(self):
+        """
+        Models to keep for every metric in lazy mode, e.g., to summarize at the end.
+        """
+        return self.cfg.get("manager", {}).get("summary_models") or []
+
+    @property
+    def state_db(self):
+        """
+        Path to a local SQLite store for manager state (restored on restart).
+        """
+        return self.cfg.get("manager", {}).get("state_db") or defaults.state_db
+
+    @property
+    def metrics_snapshot_seconds(self):
+        """
+        Seconds between snapshots of metric models to the state store.
+        """
+        return (
+            self.cfg.get("manager", {}).get("metrics_snapshot_seconds")
+            or defaults.metrics_snapshot_seconds
+        )
+
+    @property
+    def timing_samples(self):
+        """
+        Raw samples (a reservoir sample) to keep for each timed function.
+        """
+        return int(self.cfg.get("manager", {}).get("timing_samples") or defaults.timing_samples)
+
+    @property
+    def event_log_buffer(self):
+        """
+        Events to buffer in memory before appending to the event log.
+        """
+        return int(self.cfg.get("manager", {}).get("event_log_buffer") or defaults.event_log_buffer)
+
+    @property
+    def event_log_flush_seconds(self):
+        """
+        Seconds between flush of the event log.
+        """
+        return (
+            self.cfg.get("manager", {}).get("event_log_flush_seconds")
+            or defaults.event_log_flush_seconds
+        )
+
+    @property
+    def log_workers(self):
+        """
+        Maximum concurrent pod log fetches for a job.
+        """
+        return int(self.cfg.get("manager", {}).get("log_workers") or defaults.log_workers)
+
+    @property
+    def api_pool_size(self):
+        """
+        Connection pool size for the Kubernetes client.
+        """
+        return int(self.cfg.get("manager", {}).get("api_pool_size") or defaults.api_pool_size)
+
+    @property
+    def api_timeout(self):
+        """
+        Request timeout (seconds) for the Kubernetes client.
+        """
+        return self.cfg.get("manager", {}).get("api_timeout") or defaults.api_timeout
+
     @property
     def completions_needed(self):
         return self.cfg.get("workflow", {}).get("completed") or defaults.default_completions
@@ -1,20 +1,128 @@
+import operator
 import re
 
 import state_machine_operator.defaults as defaults
 
+# Comparisons supported for a when
+comparisons = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "=": operator.eq,
+}
+
+
+def compile_when(when):
+    """
+    Compile a when into a predicate that takes a metric value.
+
+    The when is parsed once here, and not on each check.
+    """
+    # No when is set, so we just continue assuming there is no when
+    if when is None:
+        return lambda value: True
+
+    # If the value is None, and the trigger is undefined
+    if when == "undefined":
+        return lambda value: value is None
+
+    # If we have a direct value, we check for equality
+    if isinstance(when, (int, float)):
+        return lambda value: value is not None and value == when
+
+    # Otherwise, parse for inequality. This could technically be a float value
+    match = re.search(r"(?P<inequality>[<>]=?|==?)\s*(?P<comparator>-?\d+(\.\d*)?)", when)
+    if not match:
+        raise ValueError(f"Invalid when {when}, must be a number or inequality")
+    compare = comparisons[match.group("inequality")]
+    comparator = float(match.group("comparator"))
+
+    # The value is None, and we can't act on it
+    return lambda value: value is not None and compare(value, comparator)
+
+
+class Condition:
+    """
+    A condition is a metric (model.step.key) and a compiled when.
+    """
+
+    def __init__(self, metric, when=None):
+        self.metric = metric
+        self.when = when
+
+        # The metric is split once, e.g., mean.job_a.duration
+        try:
+            self.model_name, self.step_name, self.key = metric.split(".", 2)
+        except ValueError:
+            raise ValueError(f"Metric {metric} must be <model>.<step>.<key>")
+        self.check = compile_when(when)
+
+    def __str__(self):
+        if self.when is None:
+            return self.metric
+        return f"{self.metric} {self.when}"
+
 
 class Rule:
     """
     A rule wraps an action with additional metadata
+
+    A rule has one condition (metric and when), or a compound of conditions
+    under "and" or "or". Conditions are compiled once, when the rule is loaded.
     """
 
     def __init__(self, rule):
         self._rule = rule
         self.disabled = False
         self.action = Action(rule)
+
+        # A compound rule has a list of conditions under and / or
+        self.operator = None
+        conditions = [rule]
+        for name in ["and", "or"]:
+            if name in rule:
+                self.operator = name
+                conditions = rule[name]
+        try:
+            self.conditions = [Condition(x.get("metric"), x.get("when")) for x in conditions]
+        except (AttributeError, ValueError) as err:
+            raise ValueError(f"when: for rule {rule} is not valid: {err}")
         self.validate()
 
-    def should_trigger(self, value):
+    def __str__(self):
+        conditions = f" {self.operator} ".join(str(x) for x in self.conditions)
+        if len(self.conditions) > 1:
+            return f"({conditions})"
+        return conditions
+
+    @property
+    def steps(self):
+        """
+        Steps that the rule is checked for (a compound rule can have more than one)
+        """
+        return set(x.step_name for x in self.conditions)
+
+    @property
+    def action_class(self):
+        """
+        State machine actions are checked before a job changes state, and workflow after.
+        """
+        if self.action.name in defaults.state_machine_actions:
+            return "state-machine"
+        return "workflow"
+
+    def evaluate(self, values):
+        """
+        Evaluate the conditions for metric values (by metric name). No side effects.
+        """
+        results = (x.check(values.get(x.metric)) for x in self.conditions)
+        if self.operator == "or":
+            return any(results)
+        return all(results)
+
+    def should_trigger(self, values):
         """
         Check if "when" is relevant to be run now, return True/False
         to say to run or not.
@@ -23,70 +131,12 @@ class Rule:
         if not self.action.should_trigger():
             return False
 
-        # No when is set, so we just continue assuming there is no when
-        if self.when is None:
-            return self.action.perform()
-
-        # If the value is None, and the trigger is undefined
-        if value is None and self.when == "undefined":
-            return self.action.perform()
-
-        # The value is None, and we can't act on it
-        if value is None:
-            return False
-
-        # If we have a direct value, we check for equality
-        number = (int, float)
-        if isinstance(self.when, number) and value != self.when:
-            return False
-        if isinstance(self.when, number) and value == self.when:
-            return self.action.perform()
-
-        # Otherwise, parse for inequality
-        match = re.search(
-            r"(?P<inequality>[<>]=?)\s*(?P<comparator>-?\d+(\.\d*)?)", self.when
-        ).groupdict()
-
-        # This could technically be a float value
-        comparator = float(match["comparator"])
-        inequality = match["inequality"]
-        assert inequality in {"<", ">", "<=", ">=", "==", "="}
-
-        # Evaluate! Not sure there is a better way than this :)
-        should_trigger = False
-        if inequality == "<":
-            should_trigger = value < comparator
-        elif inequality == "<=":
-            should_trigger = value <= comparator
-        elif inequality == ">":
-            should_trigger = value > comparator
-        elif inequality == ">=":
-            should_trigger = value >= comparator
-        elif inequality in ["==", "="]:
-            should_trigger = value == comparator
-        else:
-            raise ValueError(f"Invalid comparator {comparator} for rule when")
-
         # Perform the action if trigger is warranted, alert caller
-        if should_trigger:
+        if self.evaluate(values):
             self.action.perform()
             return True
         return False
 
-    def check_when(self):
-        """
-        Ensure we have a valid inequality before running anything!
-        """
-        # If a number, we require greater than == 0
-        if isinstance(self.when, int) and self.when >= 0:
-            return
-
-        # Check running the function with a value, should not raise error
-        try:
-            self.should_trigger(10)
-        except Exception as err:
-            raise ValueError(f"when: for rule {self} is not valid: {err}")
-
     @property
     def when(self):
         return self._rule.get("when")
@@ -100,9 +150,6 @@ class Rule:
         if self.action.name not in defaults.all_actions:
             raise ValueError(f"Event has invalid action name {self.action.name}")
 
-        # Ensure we have a valid number or inequality
-        self.check_when()
-
 
 class Action:
     """
@@ -197,7 +244,7 @@ class Action:
 
     @property
     def metric(self):
-        return self._action["metric"]
+        return self._action.get("metric")
 
     @property
     def finished(self):
@@ -3,6 +3,9 @@ registry = "registry-0.state-machine.default.svc.cluster.local:5000"
 
 # Operator label for the jobid
 operator_label = "jobid"
+
+# Label to scope jobs to one workflow (the value is derived from the prefix and config)
+workflow_label = "state-machine-workflow"
 workdir = "/tmp/out"
 
 # Workflow
@@ -11,6 +14,66 @@ state_machine_actions = ["repeat"]
 all_actions = state_machine_actions + workflow_actions
 workflow_events = ["failure", "success", "duration"]
 
+# Seconds between reconciling the manager job index with a full listing
+reconcile_seconds = 300
+
+# Maximum concurrent submissions for a batch of new job sequences
+submit_workers = 10
+
+# Maximum submissions in flight (Flux submits with async futures)
+submit_window = 64
+
+# Child Flux instances to spread jobs across (0 is none), and nodes for each
+flux_instances = 0
+flux_instance_nodes = 1
+
+# Seconds between refresh of free resources (Flux)
+resource_refresh_seconds = 10
+
+# Metrics modes: full updates every model for every value, and lazy only the models
+# that rules and summaries need (other values have a cheap mean)
+metrics_modes = ["full", "lazy"]
+metrics_mode = "full"
+
+# Relative accuracy, maximum buckets, and smallest (absolute) value for percentile sketches
+sketch_relative_accuracy = 0.01
+sketch_max_bins = 1024
+sketch_min_value = 1e-9
+
+# Local SQLite store for manager state, for a fast restart (unset is no store)
+state_db = None
+
+# Seconds between snapshots of metric models to the state store
+metrics_snapshot_seconds = 30
+
+# Raw samples (a reservoir sample) to keep for each timed function, 0 is none
+timing_samples = 0
+
+# Event log (in the working directory), and events to buffer and seconds between flush
+event_log = "workflow-events.jsonl"
+event_log_buffer = 1000
+event_log_flush_seconds = 10
+
+# Maximum concurrent event handlers (asyncio mode)
+event_workers = 16
+
+# Connection pool size and request timeout (seconds) for the Kubernetes client
+api_pool_size = 32
+api_timeout = 60
+
+# Pod log policies, and maximum concurrent pod log fetches for a job
+log_policies = ["lead", "all", "none"]
+log_workers = 8
+
+# Size (bytes) of chunks when streaming pod logs
+log_chunk_size = 64 * 1024
+
+# Recently completed job sequences to keep tombstones for (to skip events delivered again)
+tombstones_size = 10000
+
+# Maximum jobspecs (and job states) to cache beyond listed jobs (Flux)
+jobspec_cache_size = 10000
+
 # Custom metrics annotation
 metrics_key = "state-machine-metrics"
 
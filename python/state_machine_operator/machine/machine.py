@@ -3,6 +3,9 @@ from statemachine.factory import StateMachineMetaclass
 
 import state_machine_operator.tracker as tracker
 
+# Compiled state machine classes, keyed by workflow and tracker type
+state_machines = {}
+
 
 def create_state_machine_job(definition: dict, **extra_kwargs):
     """
@@ -33,6 +36,28 @@ def create_state_machine_job(definition: dict, **extra_kwargs):
     return StateMachineMetaclass("JobStateMachine", (StateMachine,), attrs_mapper)
 
 
+def init_state_machine(self, jobid, *args, step=None, **kwargs):
+    """
+    Create a state machine for one job sequence.
+
+    The class is shared across sequences, so per-sequence state (the jobid,
+    and success, failure, and repeat flags as they are set) is on the instance.
+    A state machine can be created at a step (e.g., on restore) and the job
+    for that step is not submit, since it already exists.
+    """
+    self.jobid = jobid
+
+    # Custom metrics parsed from logs, delivered to the manager, and step durations
+    self.custom_metrics = []
+    self.durations = {}
+    self.restoring = step is not None
+    if step is not None:
+        self.init_trackers()
+        kwargs["start_value"] = step
+    StateMachine.__init__(self, *args, **kwargs)
+    self.restoring = False
+
+
 def next_step_config(self, current_name):
     """
     Get the config for the next step.
@@ -58,13 +83,15 @@ def on_enter_start(self):
 
 def init_trackers(self):
     """
-    Create a job tracker for each job.
+    Get a job tracker for each job. Trackers are shared across state machines.
     """
     self.trackers = {}
     for state_name, _ in self.states_map.items():
         if state_name in ["start", "complete"]:
             continue
-        self.trackers[state_name] = self.tracker.Tracker(state_name, self.workflow)
+        self.trackers[state_name] = tracker.get_tracker(
+            self.tracker_type, state_name, self.workflow
+        )
 
 
 def is_running(self, state_name=None):
@@ -147,8 +174,9 @@ def post_completion(self, job):
     """
     # This won't work if retry was done, or we are complete
     try:
-        tracker = self.trackers[self.current_state.id]
-        tracker.save_log(job)
+        metrics = self.trackers[self.current_state.id].save_log(job)
+        if metrics:
+            self.custom_metrics.append(metrics)
     except Exception:
         pass
 
@@ -170,12 +198,13 @@ def mark_running(self, running_state):
         self.mark_succeeded(state_name=state)
 
 
-def on_change(self):
+def on_change(self, submit=True):
     """
     Call to change to submit new jobs, etc.
 
     If a state has been marked as completed (success) we don't
-    continue to run it.
+    continue to run it. A change with submit=False does not submit
+    the job, and is used by the manager to submit a batch together.
     """
     # First check if this state already had success
     # If yes, we return early (and don't submit the job again)
@@ -195,6 +224,10 @@ def on_change(self):
         self.is_complete = True
         return
 
+    # The job will be submit by the caller, or exists (we are restoring)
+    if not submit or self.restoring:
+        return
+
     # We haven't succeeded or failed - submit a new job!
     step_name = self.current_state.id
     tracker = self.trackers[step_name]
@@ -213,9 +246,8 @@ def metrics(self):
     """
     Yield (pop) current metrics.
     """
-    for step_name, step in self.trackers.items():
-        while step.metrics:
-            yield step.metrics.pop(0)
+    while self.custom_metrics:
+        yield self.custom_metrics.pop(0)
 
 
 def cleanup(self):
@@ -229,9 +261,24 @@ def cleanup(self):
             print(f"Issue cleaning up tracker {step_name}: {e}")
 
 
-def new_state_machine(config, jobid, tracker_type="kubernetes"):
+def new_state_machine(config, jobid, tracker_type="kubernetes", step=None):
+    """
+    New state machine creates a new JobStateMachine for a job sequence,
+    optionally at a step (for a job that exists).
+
+    The class is generated once per workflow (and tracker type) and cached.
+    We only generate it again if the jobs in the workflow change.
+    """
+    key = (id(config), tracker_type)
+    steps = tuple(config.jobs)
+    if key not in state_machines or state_machines[key][0] != steps:
+        state_machines[key] = (steps, generate_state_machine(config, tracker_type))
+    return state_machines[key][1](jobid, step=step)
+
+
+def generate_state_machine(config, tracker_type="kubernetes"):
     """
-    New state machine creates a new JobStateMachine.
+    Generate a new JobStateMachine class for a workflow.
 
     It's a dynamic state machine, so we start at the step that needs
     to be submit.
@@ -244,6 +291,7 @@ def new_state_machine(config, jobid, tracker_type="kubernetes"):
 
     # Extra kwargs here are class functions and "on_enter_<state>" functions
     extra_kwargs = {
+        "__init__": init_state_machine,
         "on_enter_start": on_enter_start,
         # Actions to mark as running, succeeded, or failed
         "mark_running": mark_running,
@@ -259,12 +307,11 @@ def new_state_machine(config, jobid, tracker_type="kubernetes"):
         "is_succeeded": is_succeeded,
         "is_running": is_running,
         "is_complete": False,
-        "jobid": jobid,
         "init_trackers": init_trackers,
         "workflow": config,
         "cleanup": cleanup,
         "metrics": metrics,
-        "tracker": tracker.load(tracker_type),
+        "tracker_type": tracker_type,
         "next_step_config": next_step_config,
     }
 
@@ -273,7 +320,8 @@ def new_state_machine(config, jobid, tracker_type="kubernetes"):
         states[job] = {"initial": False, "final": False}
         if i != 0:
             # These booleans determine succcess (or TBA failure)
-            # It is a condition on the change
+            # It is a condition on the change. The class has the defaults,
+            # and they are set on the instance.
             extra_kwargs[f"{last}_success"] = False
             extra_kwargs[f"{last}_failure"] = False
             events["change"].append({"from": last, "to": job, "cond": f"{last}_success"})
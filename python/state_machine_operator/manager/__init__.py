@@ -7,6 +7,7 @@ import state_machine_operator.defaults as defaults
 from state_machine_operator.client import get_subparser_helper
 from state_machine_operator.config import load_workflow_config
 
+from .async_manager import AsyncWorkflowManager
 from .manager import WorkflowManager
 
 
@@ -66,6 +67,12 @@ def get_parser():
         default=False,
         action="store_true",
     )
+    start.add_argument(
+        "--asyncio",
+        help="Handle events concurrently with an asyncio event loop.",
+        default=False,
+        action="store_true",
+    )
     start.add_argument(
         "--plain-http",
         help="Use plain http for the registry.",
@@ -106,7 +113,8 @@ def main():
 
     # Create the workflow manager
     print(f"> Launching workflow manager on ({platform.node()})")
-    manager = WorkflowManager(
+    manager_class = AsyncWorkflowManager if args.asyncio else WorkflowManager
+    manager = manager_class(
         workflow,
         scheduler=args.scheduler,
         registry=args.registry,
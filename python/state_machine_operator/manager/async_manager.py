@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .manager import WorkflowManager
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AsyncWorkflowManager(WorkflowManager):
+    """
+    A WorkflowManager that handles events with an asyncio event loop.
+
+    Events are consumed from the tracker stream as they arrive, and events
+    for different job sequences are handled concurrently. Events for the same
+    job sequence are handled in order. Blocking tracker calls (Kubernetes or
+    Flux) are run in an executor. Fetching logs for a completed job runs
+    concurrently across sequences, while changes to shared state (the job
+    index, metrics, and state machines) are done one at a time under a lock.
+    """
+
+    def watch(self):
+        """
+        Watch for changes by running the asyncio event loop.
+        """
+        asyncio.run(self.watch_events())
+
+    def stream_events(self, loop, queue):
+        """
+        Stream events from the tracker (blocking) into the asyncio queue.
+
+        An error in the stream is put on the queue to be raised by the loop.
+        """
+        try:
+            for job in self.tracker.stream_events(workflow=self.workflow.label):
+                loop.call_soon_threadsafe(queue.put_nowait, job)
+            item = None
+        except Exception as e:
+            item = e
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+
+    async def watch_events(self):
+        """
+        Consume events and handle each one as a task, ordered by jobid.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        lock = asyncio.Lock()
+
+        # The last task for each job sequence, to keep events in order
+        chains = {}
+
+        def done(jobid, task):
+            if chains.get(jobid) is task:
+                del chains[jobid]
+
+            # An error handling an event is raised by the loop (as it would be in sync mode)
+            if not task.cancelled() and task.exception() is not None:
+                queue.put_nowait(task.exception())
+
+        # The stream and each executor thread have their own tracker clients (e.g., a Flux handle)
+        with ThreadPoolExecutor(max_workers=self.workflow.event_workers) as executor:
+            loop.set_default_executor(executor)
+            threading.Thread(target=self.stream_events, args=(loop, queue), daemon=True).start()
+
+            while True:
+                item = await queue.get()
+
+                # The stream ended, or an event (or the stream) had an error
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                previous = chains.get(item.jobid)
+                task = asyncio.create_task(self.handle_event_async(item, previous, lock))
+                chains[item.jobid] = task
+                task.add_done_callback(lambda task, jobid=item.jobid: done(jobid, task))
+
+            # Finish handling events we have
+            if chains:
+                await asyncio.wait(list(chains.values()))
+
+    async def handle_event_async(self, job, previous, lock):
+        """
+        Handle one job event after any previous event for the same jobid.
+        """
+        # An error for the previous event is raised from its own task
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        loop = asyncio.get_running_loop()
+        async with lock:
+            state_machine = await loop.run_in_executor(None, self.accept_event, job)
+        if state_machine is None:
+            return
+
+        # Fetching logs is the slow part, and is done for many jobs at once
+        await loop.run_in_executor(None, self.post_completion, job, state_machine)
+        async with lock:
+            await loop.run_in_executor(None, self.process_event, job, state_machine)
@@ -0,0 +1,177 @@
+import collections
+import time
+
+import state_machine_operator.defaults as defaults
+
+# A recently completed job sequence, after the state machine is released
+Tombstone = collections.namedtuple("Tombstone", ["completed", "durations"])
+
+
+class JobIndex:
+    """
+    A JobIndex is an in-memory view of workflow jobs, keyed by jobid and step.
+
+    It is seeded from a full listing of jobs (list_jobs_by_status) and then
+    updated incrementally from events, so the manager does not need to list
+    every job in the cluster to derive the current state. A periodic reconcile
+    re-seeds the index from a full listing to catch any drift. With a
+    state store, changes to the index are written through to it.
+
+    A completed job sequence is folded into a count when the manager is done
+    with it, so the index does not grow with the number of completions. We
+    keep tombstones for a fixed number of recent ones, to skip events that
+    are delivered again for them. A job sequence is only added to the index
+    on submit (set_status) or from a listing (seed or load), so an event for
+    a folded sequence with an evicted tombstone cannot count it again.
+    """
+
+    def __init__(self, last_step, store=None, tombstones=None):
+        # The last step as success is a completion
+        self.last_step = last_step
+        self.store = store
+
+        # Lookup of jobid -> step name -> status group
+        self.jobs = {}
+
+        # Job sequences derived from the jobs above
+        self.completed = set()
+        self.active = set()
+        self.failed = set()
+        self.last_reconcile = None
+
+        # Folded job sequences (a count), and tombstones for recent ones
+        self.completions = 0
+        self.tombstones = collections.OrderedDict()
+        self.tombstones_size = tombstones or defaults.tombstones_size
+
+    def seed(self, jobs):
+        """
+        Replace the index with a full listing of jobs, grouped by status.
+        """
+        self.jobs = {}
+        self.completed = set()
+        self.active = set()
+        self.failed = set()
+        self.completions = 0
+        for status, listing in jobs.items():
+            for job in listing:
+                # Unknown to this tracker
+                if not job.jobid or not job.step_name:
+                    continue
+                if job.jobid not in self.jobs:
+                    self.jobs[job.jobid] = {}
+                self.jobs[job.jobid][job.step_name] = status
+
+        for jobid in self.jobs:
+            self.assess(jobid)
+        self.last_reconcile = time.time()
+        if self.store is not None:
+            self.store.seed_jobs(self.jobs)
+
+    def load(self, jobs):
+        """
+        Load the index from a state store, by (jobid, step) -> status.
+        """
+        self.jobs = {}
+        for (jobid, step_name), status in jobs.items():
+            if jobid not in self.jobs:
+                self.jobs[jobid] = {}
+            self.jobs[jobid][step_name] = status
+        for jobid in self.jobs:
+            self.assess(jobid)
+
+    @property
+    def completed_count(self):
+        """
+        The number of completed job sequences, folded or not.
+        """
+        return self.completions + len(self.completed)
+
+    def fold(self, jobid, durations=None):
+        """
+        Fold a completed job sequence into the count, and keep a tombstone.
+        """
+        if jobid not in self.completed:
+            return
+        self.completed.discard(jobid)
+        self.jobs.pop(jobid, None)
+        self.completions += 1
+        self.tombstones[jobid] = Tombstone(time.time(), durations or {})
+        self.tombstones.move_to_end(jobid)
+        while len(self.tombstones) > self.tombstones_size:
+            self.tombstones.popitem(last=False)
+        if self.store is not None:
+            self.store.remove_job(jobid)
+
+    def get_status(self, jobid, step_name):
+        return self.jobs.get(jobid, {}).get(step_name)
+
+    def is_stale(self, seconds):
+        """
+        Determine if it has been more than some number of seconds since a reconcile.
+        """
+        return self.last_reconcile is None or time.time() - self.last_reconcile > seconds
+
+    def update(self, job):
+        """
+        Update the index from a job event, for a job sequence it already has.
+        """
+        # Not a job associated with the workflow, or a folded (completed) sequence
+        if not job.jobid or not job.step_name or job.jobid in self.tombstones:
+            return
+
+        # Not a sequence we know (e.g., folded, and the tombstone was evicted)
+        # A full listing (seed) adds any we missed, and rebuilds the counts
+        if job.jobid not in self.jobs:
+            return
+        self.set_status(job.jobid, job.step_name, job.status)
+
+    def set_status(self, jobid, step_name, status):
+        """
+        Set the status for a job step directly, e.g., on submit
+        """
+        if jobid not in self.jobs:
+            self.jobs[jobid] = {}
+        self.jobs[jobid][step_name] = status
+        self.assess(jobid)
+        if self.store is not None:
+            self.store.set_job(jobid, step_name, status)
+
+    def remove(self, jobid):
+        """
+        Remove a job sequence from the index.
+        """
+        self.jobs.pop(jobid, None)
+        for group in [self.completed, self.active, self.failed]:
+            group.discard(jobid)
+        if self.store is not None:
+            self.store.remove_job(jobid)
+
+    def assess(self, jobid):
+        """
+        Derive the state of one job sequence from the status of its steps.
+
+        We assume any active or pending job in a sequence counts 1 toward
+        the job. If the last step is completed, the sequence is complete.
+        A failure at one step is a failure in the entire sequence.
+        """
+        for group in [self.completed, self.active, self.failed]:
+            group.discard(jobid)
+
+        steps = self.jobs[jobid]
+        statuses = set(steps.values())
+
+        # Any failed jobs are not considered further
+        if "failed" in statuses:
+            self.failed.add(jobid)
+            return
+
+        # Completed (the last step is completed)
+        if steps.get(self.last_step) == "success":
+            self.completed.add(jobid)
+            return
+
+        # Queued jobs and running jobs indicate the active jobs, and successful
+        # jobs that are not the last step haven't had their next state kicked off
+        if statuses.intersection({"queued", "running", "success"}):
+            self.active.add(jobid)
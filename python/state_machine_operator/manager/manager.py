@@ -14,9 +14,14 @@ import state_machine_operator.defaults as defaults
 import state_machine_operator.tracker as tracker
 import state_machine_operator.utils as utils
 from state_machine_operator.machine import new_state_machine
+from state_machine_operator.tracker.eventlog import EventLog
+from state_machine_operator.tracker.heartbeat import Heartbeat
+from state_machine_operator.tracker.types import SubmissionCode
 
+from .index import JobIndex
 from .metrics import WorkflowMetrics
-from .utils import timed
+from .store import StateStore
+from .utils import Timings, timed
 
 logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
@@ -54,12 +59,40 @@ class WorkflowManager:
         LOGGER.info(f" Job Prefix: [{self.prefix}]")
         LOGGER.info(f"  Scheduler: [{self.scheduler}]")
 
-        # Keep a record of times and timestamps
-        self.times = {}
+        # Keep a record of times (latency histograms) and timestamps. Timestamps
+        # are streamed to an event log, and we only keep those for the workflow
+        # and for jobs that are running.
+        self.times = Timings(self.workflow.timing_samples)
         self.timestamps = {}
+        self.events = EventLog(
+            os.path.join(self.save_dir, defaults.event_log),
+            self.workflow.event_log_buffer,
+            self.workflow.event_log_flush_seconds,
+        )
+
+        # An optional local store for state not encoded in jobs, for a fast restart
+        self.store = None
+        if self.workflow.state_db:
+            self.store = StateStore(self.workflow.state_db)
+            LOGGER.info(f"   State DB: [{self.workflow.state_db}]")
+
+        # State machines (one per in-flight job sequence), and an index of job
+        # states (completed sequences are folded into a count there)
+        self.trackers = {}
+        self.index = JobIndex(self.workflow.last_step, store=self.store)
 
         # Metrics for the workflow
-        self.metrics = WorkflowMetrics()
+        self.metrics = WorkflowMetrics(
+            self.workflow.metrics_mode,
+            self.workflow.rules,
+            self.workflow.summary_models,
+        )
+
+        # Metric models from the last snapshot, so rules don't start from zero
+        self.snapshots = None
+        if self.store is not None:
+            self.metrics.restore(self.store.load_metrics())
+
         self.init_storage(registry, plain_http, filesystem)
 
         # Prepare tracker, an event driven workload manager
@@ -88,12 +121,21 @@ class WorkflowManager:
         # This currently assumes one kind of tracker (flux or kubernetes)
         self.tracker = tracker.load(self.scheduler)
 
+        # Does our tracker have settings from the workflow (e.g., the API client)?
+        if hasattr(self.tracker, "configure"):
+            self.tracker.configure(self.workflow)
+
+        # Does our tracker have a live view of free resources?
+        self.resources = None
+        if hasattr(self.tracker, "Resources"):
+            self.resources = self.tracker.Resources(self.workflow)
+
         # This is an empty (faux) watcher
-        self.watcher = tracker.Watcher()
+        self.watcher = tracker.Watcher(events=self.events)
 
         # Does our tracker have a custom watchers?
         if hasattr(self.tracker, "Watcher"):
-            self.watcher = self.tracker.Watcher()
+            self.watcher = self.tracker.Watcher(events=self.events)
 
     def init_registry(self, registry, plain_http=None):
         """
@@ -112,7 +154,11 @@ class WorkflowManager:
         jobid = self.prefix + str(number).zfill(9)
 
         # This is hugely unlikely to happen, but you never know!
-        if jobid in self.trackers:
+        if (
+            jobid in self.trackers
+            or jobid in self.index.tombstones
+            or jobid in self.index.jobs
+        ):
             return self.generate_id()
         return jobid
 
@@ -128,79 +174,54 @@ class WorkflowManager:
         """
         Wrapper to tracker list jobs by status to allow timing
         """
-        return self.tracker.list_jobs_by_status()
+        return self.tracker.list_jobs_by_status(workflow=self.workflow.label)
 
-    def get_current_state(self):
+    def reconcile(self):
         """
-        Get the number of active and completed jobs.
+        Seed (or re-seed) the job index from a full listing of jobs.
 
-        We assume any active or pending job in a sequence counts 1 toward
-        the job. If all steps are completed, the workflow is complete.
-        We always get the state directly from the cluster, because any
-        other method might not be accurate. We don't want to submit
-        new jobs over that. We also return all jobs to have if needed
-        that coincide with the same data the states were derived from.
+        This is done on init, and periodically after to catch any drift
+        between the index and the cluster. We return the listing to use
+        for the same data the index was derived from.
         """
-        # Get jobs that are in the first stage to determine sequences active
         jobs = self.list_jobs_by_status()
 
         # Give a warning about unknown jobs
         # In practice, this is a state not properly accounted for
         if jobs["unknown"]:
             LOGGER.warning(f"Found {len(jobs['unknown'])} unknown jobs to investigate.")
+        self.index.seed(jobs)
 
-        active_jobs = set()
-        completions = set()
-        failed_jobs = set()
-
-        # The last step as success is a completion
-        last_step = self.workflow.last_step
-
-        # Any failed jobs are not considered further
-        for job in jobs["failed"]:
-            if job.jobid:
-                failed_jobs.add(job.jobid)
-
-        # First assess completions - the last step that is completed
-        for job in jobs["success"]:
-
-            # Unknown to this tracker or is completed/failed (a global state)
-            if not job.jobid or not job.step_name or job.jobid in failed_jobs:
-                continue
-
-            # Completed
-            if job.step_name == last_step:
-                completions.add(job.jobid)
-
-        # Queued jobs and running jobs indicate the active jobs
-        for job in jobs["queued"] + jobs["running"]:
-            if not job.jobid or job.jobid in completions or job.jobid in failed_jobs:
-                continue
-            active_jobs.add(job.jobid)
+        # Completed sequences we are not tracking are folded into the count
+        for jobid in list(self.index.completed):
+            if jobid not in self.trackers:
+                self.index.fold(jobid)
+        return jobs
 
-        # Finally, successful jobs that are not the last step
-        # and haven't had their next state kicked off... we assume a failure
-        # at once step is a failure in the entire job
-        for job in jobs["success"]:
-            if (
-                job.step_name != last_step
-                and job.jobid not in completions
-                and job.jobid not in failed_jobs
-            ):
-                active_jobs.add(job.jobid)
+    def get_current_state(self):
+        """
+        Get the active and failed job sequences, and the number completed.
 
+        We assume any active or pending job in a sequence counts 1 toward
+        the job. If all steps are completed, the workflow is complete.
+        The state is derived from the job index, which is seeded from the
+        cluster and updated with each event, and reconciled periodically.
+        """
         return {
-            "completed": completions,
-            "active": active_jobs,
-            "jobs": jobs,
-            "failed": failed_jobs,
+            "completed": self.index.completed_count,
+            "active": self.index.active,
+            "failed": self.index.failed,
         }
 
     def init_state(self):
         """
         Look at the state of the cluster and initialize trackers to match it.
+
+        With a state store, we restore state machines (and the job index) from
+        it first, and only handle jobs that changed while we were down.
         """
         self.trackers = {}
+        restored = self.restore_state()
 
         # Determine current state of cluster, create state machine for each job
         # Note this will return steps from across a single state machine. If job:
@@ -208,19 +229,22 @@ class WorkflowManager:
         #    Failed we won't continue (and shouldn't make a state machine
         #    Unknown (this shouldn't happen, let's show these)
         #    Running: we assume previous steps successful
-        current_state = self.get_current_state()
-        completed_jobs = current_state["completed"]
-        jobs = current_state["jobs"]
+        jobs = self.reconcile()
+        completed_jobs = self.get_current_state()["completed"]
         active_jobs = jobs["running"] + jobs["queued"]
 
         # Create a new state machine per active job. By the time we get here,
         # we already know there is a step name and jobid
         for job in active_jobs:
-            # Get existing or new state machine for it
-            state_machine = self.get_state_machine(job)
-            # The job is active, kick off the next steps
+            # A restored state machine is already at its step
+            if job.jobid in self.trackers:
+                continue
+            # Get existing or new state machine for it, at the step of the job
+            state_machine = self.get_state_machine(job, step=job.step_name)
+            # The job is active, mark previous steps as succeeded
             state_machine.mark_running(job.step_name)
             self.trackers[job.jobid] = state_machine
+            self.save_sequence(job.jobid)
 
         # A succeeded job not in the last step needs to be monitored
         last_step = self.workflow.last_step
@@ -228,25 +252,163 @@ class WorkflowManager:
             # Don't monitor if it's completed or we are already tracking
             if job.step_name == last_step or job.jobid in self.trackers:
                 continue
-            state_machine = self.get_state_machine(job)
+            # A later step of the sequence failed (or it is complete)
+            if job.jobid not in self.index.active:
+                continue
+            state_machine = self.get_state_machine(job, step=job.step_name)
             # This will mark all steps up to this one as succeeded
             state_machine.mark_running(job.step_name)
+            state_machine.mark_succeeded(state_name=job.step_name)
             # Transition to the next step. This will error if we already have
             try:
                 state_machine.change()
                 self.trackers[job.jobid] = state_machine
+                self.save_sequence(job.jobid)
             except Exception:
                 LOGGER.info(
                     f"Step {job.step_name} for job {job.jobid} already transitioned"
                 )
 
-        LOGGER.info(
-            f"Manager running with {len(completed_jobs)} job sequence completions."
-        )
+        # Restored sequences with jobs we no longer see are not tracked
+        if restored is not None:
+            for jobid in list(self.trackers):
+                if jobid not in self.index.jobs:
+                    del self.trackers[jobid]
+                    self.save_sequence(jobid)
+
+            # We can crash after submitting the next step, and before saving the sequence
+            for jobid, state_machine in list(self.trackers.items()):
+                step_name = self.get_latest_step(jobid)
+                if step_name is not None and self.stages.index(
+                    step_name
+                ) > self.stages.index(state_machine.current_state.id):
+                    state_machine = new_state_machine(
+                        self.workflow, jobid, self.scheduler, step=step_name
+                    )
+                    state_machine.mark_running(step_name)
+                    self.trackers[jobid] = state_machine
+                    self.save_sequence(jobid)
+
+            # Handle jobs that changed while we were down, as we would the event.
+            # A finished job on the step its sequence is on was not handled (we
+            # crashed after the index was updated, and before the next step).
+            changed = [
+                job
+                for listing in jobs.values()
+                for job in listing
+                if job.jobid in self.trackers
+                and (
+                    restored.get((job.jobid, job.step_name)) != job.status
+                    or (
+                        job.status in ["success", "failed"]
+                        and job.step_name == self.trackers[job.jobid].current_state.id
+                    )
+                )
+            ]
+            LOGGER.info(
+                f"Restored state, {len(changed)} jobs changed while we were down"
+            )
+            for job in changed:
+                self.handle_event(job)
+
+        LOGGER.info(f"Manager running with {completed_jobs} job sequence completions.")
         # TODO we likely want some logic to cleanup failed
         # But this might not always be desired
 
-    def get_state_machine(self, job):
+    def get_latest_step(self, jobid):
+        """
+        Get the latest step of a job sequence that we have a job for.
+        """
+        steps = self.index.jobs.get(jobid, {})
+        steps = [step_name for step_name in self.stages if step_name in steps]
+        if steps:
+            return steps[-1]
+
+    def restore_state(self):
+        """
+        Restore state from the state store, if we have one with state.
+
+        Returns the job statuses we had, by (jobid, step), to find the jobs
+        that changed while we were down.
+        """
+        if self.store is None or not self.store.has_state():
+            return
+        state = self.store.load()
+
+        # Changes to the workflow config (grow or shrink)
+        for step_name, nnodes in state["steps"].items():
+            if step_name in self.workflow.jobs:
+                self.workflow.jobs[step_name]["config"]["nnodes"] = nnodes
+
+        # Rule state, by index in the workflow rules
+        for index, (repetitions, backoff_counter) in state["rules"].items():
+            if index < len(self.workflow.rules):
+                action = self.workflow.rules[index].action
+                action.repetitions = repetitions
+                action.backoff_counter = backoff_counter
+
+        # State machines, each at the step it was on
+        self.index.load(state["jobs"])
+        for jobid, (step_name, repeat) in state["sequences"].items():
+            if step_name not in self.workflow.jobs:
+                continue
+            state_machine = new_state_machine(
+                self.workflow, jobid, self.scheduler, step=step_name
+            )
+            state_machine.mark_running(step_name)
+            if repeat:
+                state_machine.repeat(step_name)
+            self.trackers[jobid] = state_machine
+
+        LOGGER.info(
+            f"Restored {len(self.trackers)} job sequences from {self.store.path}"
+        )
+        return state["jobs"]
+
+    def evict(self, jobid):
+        """
+        Fold a completed job sequence into the index, and release the state machine.
+        """
+        state_machine = self.trackers.pop(jobid, None)
+        if state_machine is None:
+            return
+        self.index.fold(jobid, state_machine.durations)
+        self.events.record(
+            "sequence_complete", jobid=jobid, durations=state_machine.durations
+        )
+
+    def save_metrics(self):
+        """
+        Save a snapshot of metric models updated since the last one.
+        """
+        snapshot = []
+        try:
+            snapshot = self.metrics.snapshot()
+            if snapshot:
+                self.store.save_metrics(snapshot)
+        except Exception as e:
+            # The models are saved with the next snapshot
+            self.metrics.mark_dirty(snapshot)
+            LOGGER.warning(f"Issue saving metrics snapshot: {e}")
+
+    def save_sequence(self, jobid):
+        """
+        Save the step a job sequence is on to the state store, or remove it if done.
+        """
+        if self.store is None:
+            return
+        state_machine = self.trackers.get(jobid)
+        if state_machine is None or state_machine.current_state.id in [
+            "start",
+            "complete",
+        ]:
+            self.store.remove_sequence(jobid)
+            return
+        self.store.set_sequence(
+            jobid, state_machine.current_state.id, state_machine.is_repeating()
+        )
+
+    def get_state_machine(self, job, step=None):
         """
         Generate a new state machine. This shouldn't take long.
         """
@@ -254,8 +416,8 @@ class WorkflowManager:
             state_machine = self.trackers[job.jobid]
         else:
             state_machine = new_state_machine(
-                self.workflow, job.jobid, self.scheduler
-            )()
+                self.workflow, job.jobid, self.scheduler, step=step
+            )
         return state_machine
 
     def check_complete(self):
@@ -266,7 +428,7 @@ class WorkflowManager:
         we can cleanup, etc.
         """
         current_state = self.get_current_state()
-        completions = len(current_state["completed"])
+        completions = current_state["completed"]
         jobs_needed = self.workflow.completions_needed - completions
         if jobs_needed <= 0:
             LOGGER.info(
@@ -282,11 +444,21 @@ class WorkflowManager:
         """
         self.add_timestamp("workflow_complete")
 
-        # Stop the watcher and save output
+        # Stop the watcher (and resource refresh) and save output
+        if self.resources is not None:
+            self.resources.stop()
+        if self.snapshots is not None:
+            self.snapshots.stop()
+            self.save_metrics()
         self.watcher.stop()
         self.watcher.save(self.save_dir)
+        self.events.stop()
         self.save_times()
 
+        # The tracker can clean up what it started for the workflow (e.g., Flux instances)
+        if hasattr(self.tracker, "shutdown"):
+            self.tracker.shutdown()
+
         # Print final model metrics
         self.metrics.summarize_all()
 
@@ -301,9 +473,10 @@ class WorkflowManager:
     def save_times(self):
         """
         Print final times and timestamps to the console, and
-        also save to file in the working directory.
+        also save to file in the working directory. Timestamps
+        for jobs are in the event log.
         """
-        times = {"times": self.times, "timestamps": self.timestamps}
+        times = {"times": self.times.to_dict(), "timestamps": self.timestamps}
         print("=== times\n" + json.dumps(times) + "\n===")
         utils.write_json(times, os.path.join(self.save_dir, "workflow-times.json"))
 
@@ -318,7 +491,7 @@ class WorkflowManager:
         """
         # Start by getting the current state of the cluster
         current_state = self.get_current_state()
-        completions = len(current_state["completed"])
+        completions = current_state["completed"]
         active_jobs = len(current_state["active"])
 
         # These start at "start" stage (is_started should be false)
@@ -343,6 +516,13 @@ class WorkflowManager:
         # If submit is > than completions needed, we don't need that many
         submit_n = min(jobs_needed, submit_n)
 
+        # Only submit sequences that can start now, if we know free resources.
+        # If nothing is active we submit one anyway, so we have an event to wake on.
+        if self.resources is not None:
+            available = self.resources.available(step)
+            if available is not None:
+                submit_n = min(submit_n, max(available, 1 if active_jobs == 0 else 0))
+
         logfn = LOGGER.debug if self.quiet else LOGGER.info
 
         # Nothing to submit, don't report an update
@@ -358,19 +538,60 @@ class WorkflowManager:
         logfn(f"  > jobs needed                 {jobs_needed} ")
         logfn(f"  > nodes allowed               {nodes_allowed} ")
         logfn(f"  > jobs allowed                {jobs_allowed}\n")
+        if self.resources is not None:
+            logfn(f"  > free nodes                  {self.resources.free_nodes}")
+            logfn(f"  > free cores                  {self.resources.free_cores}\n")
         logfn("> Workflow progress")
         logfn(f"  > Completions                 {completions}")
         logfn(f"  > In progress                 {active_jobs}")
         logfn(f"  > New job sequences submit    {submit_n} ")
 
+        jobids = []
         for _ in range(0, submit_n):
             jobid = self.generate_id()
 
             # Create a new state machine with job trackers, and change
-            # change goes into the first state (the first step to submit)
-            state_machine = new_state_machine(self.workflow, jobid, self.scheduler)()
-            state_machine.change()
+            # change goes into the first state (the first step to submit).
+            # We submit the new sequences together after.
+            state_machine = new_state_machine(self.workflow, jobid, self.scheduler)
+            state_machine.change(submit=False)
             self.trackers[jobid] = state_machine
+            self.save_sequence(jobid)
+
+            # Count the sequence as active before we see the first event for it
+            self.index.set_status(jobid, self.workflow.first_step, "queued")
+            jobids.append(jobid)
+
+        # Claim resources for the new sequences until they are allocated
+        if self.resources is not None:
+            self.resources.claim(step, jobids)
+
+        self.submit_sequences(jobids)
+
+    @timed
+    def submit_sequences(self, jobids):
+        """
+        Submit the first step for a batch of new job sequences.
+
+        Submissions are done concurrently by the step tracker. A sequence
+        that fails to submit is no longer tracked, so it can be replaced.
+        """
+        step_tracker = tracker.get_tracker(
+            self.scheduler, self.workflow.first_step, self.workflow
+        )
+        submissions = step_tracker.submit_jobs(
+            jobids, workers=self.workflow.submit_workers
+        )
+        for jobid, submit_record in submissions:
+            if submit_record.status != SubmissionCode.ERROR:
+                continue
+            LOGGER.warning(f"Job sequence {jobid} failed to submit, removing")
+            if self.resources is not None:
+                self.resources.release(jobid, allocated=False)
+            self.trackers[jobid].mark_failed()
+            del self.trackers[jobid]
+            self.save_sequence(jobid)
+            self.index.remove(jobid)
 
     @timed
     def start(self):
@@ -391,6 +612,7 @@ class WorkflowManager:
 
         This timed function should capture the entire workflow execution.
         """
+        self.events.start()
         self.add_timestamp("workflow_start")
 
         # Each tracker is a state machine for one job sequence
@@ -405,8 +627,19 @@ class WorkflowManager:
         # We can now submit new simulations with the space we have. We assume
         # each sequence gets one job running at once (one slot in the cluster)
         # and can submit up to the max size. This algorithm can change.
+        # A tracker with a view of free resources limits this to what can start.
+        if self.resources is not None:
+            self.resources.start()
         self.new_jobs()
 
+        # Snapshot metric models on a heartbeat (in a thread, not on event handling)
+        if self.store is not None:
+            self.snapshots = Heartbeat(
+                self.workflow.metrics_snapshot_seconds, self.save_metrics
+            )
+            self.snapshots.daemon = True
+            self.snapshots.start()
+
         # Does our tracker have watchers?
         self.watcher.start()
 
@@ -415,76 +648,93 @@ class WorkflowManager:
 
     def add_timestamp(self, name, timestamp=None):
         """
-        Add a timestamp to times. This assumes unique names.
+        Add a timestamp to times and the event log. This assumes unique names.
         """
         # Don't repeat times for repeatable jobs
         if name in self.timestamps:
             return
         self.timestamps[name] = timestamp or time.time()
+        self.events.record("timestamp", self.timestamps[name], name=name)
+
+    def add_job_timestamp(self, job, event):
+        """
+        Add a timestamp for the end of a job (succeeded or failed) to the event log.
+
+        We don't need the start for the job in memory after. A repeated job can
+        have more than one, and the parser uses the first.
+        """
+        self.timestamps.pop(f"{job.label}_start", None)
+        self.events.record("timestamp", name=f"{job.label}_{event}")
 
     def succeed_job(self, job, state_machine):
         """
         A state machine can succeed if it exits with 0 or is marked to always succeed.
         """
-        self.add_timestamp(f"{job.label}_succeeded")
+        self.add_job_timestamp(job, "succeeded")
         LOGGER.debug(
             f"Job {job.jobid} completed stage '{state_machine.current_state.id}'"
         )
         state_machine.mark_succeeded(job)
 
-        # Change successful jobs it not complete
+        # Change successful jobs it not complete. This submits the next step
         if job.is_succeeded() and state_machine.current_state.id != "complete":
-            state_machine.change()
+            with self.times.time("submit_step"):
+                state_machine.change()
 
     def fail_job(self, job, state_machine):
         """
         Fail the state machine based on job outcome.
         """
-        self.add_timestamp(f"{job.label}_failed")
+        self.add_job_timestamp(job, "failed")
         LOGGER.debug(f"Job {job.jobid} failed stage '{state_machine.current_state.id}'")
         # Marking a job failed deletes all Kubernetes objects associated across stages.
         # We do this because we assume no step should be retried, etc.
         state_machine.mark_failed(job)
         # If we get here, the job has already done retries for the step
         # We need to cancel the state machine (all associated jobs)
-        state_machine.cleanup()
+        with self.times.time("cleanup"):
+            state_machine.cleanup()
 
         # Deleting the state machine means we stop tracking it
         if job.jobid in self.trackers:
             del self.trackers[job.jobid]
 
-    def iter_triggers(self, job):
+    def iter_triggers(self, job, action_class):
         """
         Shared function to iterate through workflow triggers. These
         rules are delivered to both the metrics checking functions
         for the workflow and for state machines.
-        """
-        # The self.workflow.rules has indices that correspond to metrics lookup
-        for metric, triggers in self.workflow.rules.items():
-            model_name, step_name, key = metric.split(".")
-            if job.step_name != step_name:
-                continue
-
-            # Is the metric known to us?
-            if model_name not in self.metrics.models:
-                LOGGER.warning(f"Model metric {model_name} is not known")
-                continue
 
-            # This is a specific river streaming ML model
-            model = self.metrics.models[model_name]
-
-            # Lookup a metric value by the job stay and name. E.g,. count.job_a.failed
-            # If a metric is not defined yet, we assume a value of None / undefined
-            try:
-                value = model[job.step_name][key].get()
-            except KeyError:
-                # Most models / metrics won't have values at initial runs
-                value = None
-
-            # Perform actions
-            for trigger in triggers:
-                yield trigger, value
+        Rules are indexed by step and action class, so we only see rules
+        for the job step. Each is yielded with metric values it needs.
+        """
+        for trigger in self.workflow.get_rules(job.step_name, action_class):
+            values = {}
+            for condition in trigger.conditions:
+
+                # Is the metric known to us?
+                if condition.model_name not in self.metrics.models:
+                    LOGGER.warning(f"Model metric {condition.model_name} is not known")
+                    values = None
+                    break
+
+                # This is a specific river streaming ML model
+                model = self.metrics.models[condition.model_name]
+
+                # Lookup a metric value by the job stay and name. E.g,. count.job_a.failed
+                # If a metric is not defined yet, we assume a value of None / undefined
+                try:
+                    values[condition.metric] = model[condition.step_name][
+                        condition.key
+                    ].get()
+                except KeyError:
+                    # Most models / metrics won't have values at initial runs
+                    values[condition.metric] = None
+
+            if values is not None:
+                yield trigger, values
 
+    @timed
     def check_state_machine_metrics(self, job, state_machine):
         """
         Check metrics that are delivered to state machines.
@@ -493,16 +743,16 @@ class WorkflowManager:
         the checks need to happen before jobs change state.
         """
         # Rules that are provided here match the job step name
-        for trigger, value in self.iter_triggers(job):
-            if trigger.action.name not in defaults.state_machine_actions:
-                continue
+        for trigger, values in self.iter_triggers(job, "state-machine"):
 
             # And check against the condition
-            if trigger.should_trigger(value):
+            if trigger.should_trigger(values):
+                self.save_rule(trigger)
                 self.trigger_workflow_action(
-                    trigger, job.step_name, value, state_machine
+                    trigger, job.step_name, describe_values(values), state_machine
                 )
 
+    @timed
     def check_workflow_metrics(self, job, state_machine):
         """
         Check metrics against workflow specified.
@@ -511,16 +761,22 @@ class WorkflowManager:
         be run after jobs change state.
         """
         # Rules that are provided here match the job step name
-        for trigger, value in self.iter_triggers(job):
-            if trigger.action.name not in defaults.workflow_actions:
-                continue
+        for trigger, values in self.iter_triggers(job, "workflow"):
 
             # And check against the condition
-            if trigger.should_trigger(value):
+            if trigger.should_trigger(values):
+                self.save_rule(trigger)
                 self.trigger_workflow_action(
-                    trigger, job.step_name, value, state_machine
+                    trigger, job.step_name, describe_values(values), state_machine
                 )
 
+    def save_rule(self, trigger):
+        """
+        Save rule state (repetitions and backoff) after it is performed.
+        """
+        if self.store is not None:
+            self.store.set_rule(self.workflow.rules.index(trigger), trigger)
+
     def trigger_grow(self, trigger, step_name, value):
         """
         Trigger the job to grow.
@@ -532,15 +788,15 @@ class WorkflowManager:
         max_size = trigger.action.max_size
         if previous + 1 >= max_size:
             LOGGER.info(
-                f"Grow triggered: {trigger.action.metric} {trigger.when} ({value}), already >= max size {max_size}"
+                f"Grow triggered: {trigger} ({value}), already >= max size {max_size}"
             )
             return
 
         self.workflow.jobs[step_name]["config"]["nnodes"] += 1
         updated = self.workflow.jobs[step_name]["config"]["nnodes"]
-        LOGGER.info(
-            f"Grow triggered: {trigger.action.metric} {trigger.when} ({value}), nodes {previous}=>{updated}"
-        )
+        if self.store is not None:
+            self.store.set_nnodes(step_name, updated)
+        LOGGER.info(f"Grow triggered: {trigger} ({value}), nodes {previous}=>{updated}")
 
     def trigger_shrink(self, trigger, step_name, value):
         """
@@ -550,13 +806,15 @@ class WorkflowManager:
         min_size = trigger.action.min_size or 1
         if previous <= min_size:
             LOGGER.info(
-                f"Shrink triggered: {trigger.action.metric} {trigger.when} ({value}), already at min size {min_size}"
+                f"Shrink triggered: {trigger} ({value}), already at min size {min_size}"
             )
             return
         self.workflow.jobs[step_name]["config"]["nnodes"] -= 1
         updated = self.workflow.jobs[step_name]["config"]["nnodes"]
+        if self.store is not None:
+            self.store.set_nnodes(step_name, updated)
         LOGGER.info(
-            f"Shrink triggered: {trigger.action.metric} {trigger.when} ({value}), nodes {previous}=>{updated}"
+            f"Shrink triggered: {trigger} ({value}), nodes {previous}=>{updated}"
         )
 
     def trigger_workflow_action(self, trigger, step_name, value, state_machine):
@@ -569,7 +827,7 @@ class WorkflowManager:
         """
         # This action has a minimum number of total completions
         if trigger.action.min_completions:
-            completions = len(self.get_current_state()["completed"])
+            completions = self.get_current_state()["completed"]
             if completions < trigger.action.min_completions:
                 return
 
@@ -578,17 +836,13 @@ class WorkflowManager:
 
             # This marks the step as repeatable, so when it is flagged as succeeded by the manager
             # the step_succeeded flag won't also be applied, which transitions to next step
-            LOGGER.info(
-                f"Step {step_name} is marked for repeat: {trigger.action.metric} {trigger.when} ({value})"
-            )
+            LOGGER.info(f"Step {step_name} is marked for repeat: {trigger} ({value})")
             state_machine.repeat(step_name)
             return True
 
         # [workflow] Finish the workflow
         if trigger.action.name == "finish-workflow":
-            LOGGER.info(
-                f"Workflow completion triggered: {trigger.action.metric} {trigger.when} ({value})"
-            )
+            LOGGER.info(f"Workflow completion triggered: {trigger} ({value})")
             self.complete_workflow()
 
         # TODO: think about use case / mechanism for dynamic grow.
@@ -616,12 +870,9 @@ class WorkflowManager:
         duration = job.duration()
         if job.is_completed() and duration is not None:
             self.metrics.add_model_entry("duration", duration, step=job.step_name)
+            state_machine.durations[job.step_name] = duration
 
-        # Read logs, etc. We need this to run on repeats as well.
-        if job.is_completed():
-            state_machine.post_completion(job)
-
-        # Load custom metrics from the tracker
+        # Load custom metrics from the tracker (parsed on post completion)
         self.load_custom_metrics(state_machine)
 
     def load_custom_metrics(self, state_machine):
@@ -647,76 +898,142 @@ class WorkflowManager:
         Record first event for a job. This is considered the start.
         If we've seen it, ignore.
         """
-        label = f"{label}_start"
-        if label in self.timestamps:
-            return
-
-        # This will only have one entry
-        self.timestamps[label] = time.time()
+        self.add_timestamp(f"{label}_start")
 
     def watch(self):
         """
         Watch is an event driven means to watch for changes and update job states
         accordingly.
         """
-        for job in self.tracker.stream_events():
+        for job in self.tracker.stream_events(workflow=self.workflow.label):
+            self.handle_event(job)
 
-            # Not a job associated with the workflow, or is ignored
-            if not job.jobid or not job.step_name or job.jobid not in self.trackers:
-                LOGGER.warning(f"Job {job} does not have an identifier")
-                continue
+    def handle_event(self, job):
+        """
+        Handle one job event, from acceptance through to state changes.
+        """
+        state_machine = self.accept_event(job)
+        if state_machine is None:
+            return
+        self.post_completion(job, state_machine)
+        self.process_event(job, state_machine)
 
-            # Record first seen (if not seen yet) for jobid and step
-            self.add_timestamp_first_seen(job.label)
+    def accept_event(self, job):
+        """
+        Update the job index for an event, and determine if we act on it.
 
-            # Get the state machine for the job
-            state_machine = self.trackers[job.jobid]
+        Returns the state machine for the job, or None if the event is ignored.
+        """
+        # Periodically reconcile the job index against a full listing
+        if self.index.is_stale(self.workflow.reconcile_seconds):
+            self.reconcile()
+
+        # Keep the job index current, including jobs we are not tracking
+        self.index.update(job)
+
+        # A job that is no longer queued was allocated, and no longer holds a claim
+        if self.resources is not None and job.status != "queued":
+            self.resources.release(job.jobid)
+
+        # A completed sequence (the event is likely delivered again)
+        if job.jobid in self.index.tombstones:
+            LOGGER.debug(f"Job sequence {job.jobid} is completed, skipping")
+            return
+
+        # Not a job associated with the workflow, or is ignored
+        if not job.jobid or not job.step_name or job.jobid not in self.trackers:
+            LOGGER.warning(f"Job {job} does not have an identifier")
+            return
+
+        # Get the state machine for the job
+        state_machine = self.trackers[job.jobid]
+
+        # A stream can deliver an event more than once (e.g., after a relist)
+        # and we only act on events for the step the state machine is on
+        if job.step_name != state_machine.current_state.id:
+            LOGGER.debug(f"Job {job.label} is not the current step, skipping")
+            return
+
+        # Record first seen (if not seen yet) for jobid and step
+        self.add_timestamp_first_seen(job.label)
+
+        # The job is active and not finished, keep going
+        # This status will trigger when it's created (after submit)
+        if job.is_active() and not job.is_completed():
+            LOGGER.info(f"Job {job.jobid} is active and not completed")
+            return
+        return state_machine
+
+    @timed
+    def post_completion(self, job, state_machine):
+        """
+        Read logs, etc. We need this to run on repeats as well.
+
+        This only touches the state machine for the job (not shared state),
+        so it can be run for different job sequences at the same time.
+        """
+        if job.is_completed():
+            state_machine.post_completion(job)
+
+    def process_event(self, job, state_machine):
+        """
+        Update metrics and change state for an accepted (completed) job event.
+        """
+        # Update metrics. This pops metrics parsed from post completion
+        # This needs to happen before the job changes state, as metrics can inform what happens.
+        self.update_metrics(job, state_machine)
+
+        # State machine changes can be influenced by metrics (e.g., repeat)
+        # so we check them before state changes below. If we repeat a job, we
+        # don't want to mark as failed or succeeded. The call to repeat()
+        # deletes the previous job and creates a replica
+        self.check_state_machine_metrics(job, state_machine)
+
+        # Was the step marked for repeat? If so, we don't want to submit new jobs
+        # There can be a race. The succeed/fail functions below will remove repeating,
+        # so we need to grab the state here.
+        is_repeating = state_machine.is_repeating()
+
+        # This is a case where the job failed, but we allow failure and keep going
+        if job.is_failed() and job.always_succeed:
+            LOGGER.info(f"Job {job.jobid} is failed, mark success")
+            self.succeed_job(job, state_machine)
+
+        # The job ran successfully, trigger the next step
+        elif job.is_succeeded():
+            LOGGER.info(f"Job {job.jobid} is successful")
+            self.succeed_job(job, state_machine)
+
+        # The job just completed and failed, clean up.
+        elif job.is_failed():
+            LOGGER.info(f"Job {job.jobid} is failed")
+            self.fail_job(job, state_machine)
+
+        # Check if the workflow is complete
+        self.check_complete()
+
+        # Check metrics for any actions to take
+        # Since a specific job will just change, we check
+        # for specific steps oriented to a job. This is also when
+        # a step that is allowed to repeat can be flagged to do so.
+        self.check_workflow_metrics(job, state_machine)
+
+        # Save the step the sequence is on (or that it is done)
+        self.save_sequence(job.jobid)
+
+        # A completed sequence is folded into the index (metrics are harvested above)
+        if state_machine.current_state.id == "complete":
+            self.evict(job.jobid)
+
+        # Check to see if we should submit new jobs, only if the job isn't repeating
+        if not is_repeating:
+            self.new_jobs()
 
-            # The job is active and not finished, keep going
-            # This status will trigger when it's created (after submit)
-            if job.is_active() and not job.is_completed():
-                LOGGER.info(f"Job {job.jobid} is active and not completed")
-                continue
 
-            # Update metrics. This pops metrics parsed from post completion
-            # This needs to happen before the job changes state, as metrics can inform what happens.
-            self.update_metrics(job, state_machine)
-
-            # State machine changes can be influenced by metrics (e.g., repeat)
-            # so we check them before state changes below. If we repeat a job, we
-            # don't want to mark as failed or succeeded. The call to repeat()
-            # deletes the previous job and creates a replica
-            self.check_state_machine_metrics(job, state_machine)
-
-            # Was the step marked for repeat? If so, we don't want to submit new jobs
-            # There can be a race. The succeed/fail functions below will remove repeating,
-            # so we need to grab the state here.
-            is_repeating = state_machine.is_repeating()
-
-            # This is a case where the job failed, but we allow failure and keep going
-            if job.is_failed() and job.always_succeed:
-                LOGGER.info(f"Job {job.jobid} is failed, mark success")
-                self.succeed_job(job, state_machine)
-
-            # The job ran successfully, trigger the next step
-            elif job.is_succeeded():
-                LOGGER.info(f"Job {job.jobid} is successful")
-                self.succeed_job(job, state_machine)
-
-            # The job just completed and failed, clean up.
-            elif job.is_failed():
-                LOGGER.info(f"Job {job.jobid} is failed")
-                self.fail_job(job, state_machine)
-
-            # Check if the workflow is complete
-            self.check_complete()
-
-            # Check metrics for any actions to take
-            # Since a specific job will just change, we check
-            # for specific steps oriented to a job. This is also when
-            # a step that is allowed to repeat can be flagged to do so.
-            self.check_workflow_metrics(job, state_machine)
-
-            # Check to see if we should submit new jobs, only if the job isn't repeating
-            if not is_repeating:
-                self.new_jobs()
+def describe_values(values):
+    """
+    Describe metric values for a trigger, e.g., for logging.
+    """
+    if len(values) == 1:
+        return list(values.values())[0]
+    return ", ".join(f"{metric}={value}" for metric, value in values.items())
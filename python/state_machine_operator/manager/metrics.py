@@ -1,8 +1,16 @@
+import functools
 import json
 import logging
+import pickle
+import threading
+import zlib
 
 from river import stats
 
+import state_machine_operator.defaults as defaults
+
+from .sketch import Percentile
+
 logging.basicConfig(level=logging.INFO)
 LOGGER = logging.getLogger(__name__)
 
@@ -13,8 +21,16 @@ model_inits = {
     "max": stats.Max,
     "min": stats.Min,
     "mad": stats.MAD,
+    # Percentiles are sketches with fixed memory, and can be merged
+    "p50": functools.partial(Percentile, 50),
+    "p90": functools.partial(Percentile, 90),
+    "p95": functools.partial(Percentile, 95),
+    "p99": functools.partial(Percentile, 99),
 }
 
+# Models kept for every metric in lazy mode (counts are separate)
+lazy_models = ["mean"]
+
 
 class WorkflowMetrics:
     """
@@ -23,15 +39,45 @@ class WorkflowMetrics:
     We use river.xyx stats functions:
 
     https://riverml.xyz/latest/api/stats/Mean
+
+    In lazy mode, a metric (step and key) only has the models that rules
+    ask for, and summary models, and otherwise a mean. Models like IQR and
+    MAD hold growing state, and are not kept for metrics that nobody reads.
     """
 
-    def __init__(self):
+    def __init__(self, mode=None, rules=None, summary_models=None):
         # Generate lookup of river models above
         self.models = {name: {} for name, _ in model_inits.items()}
 
         # Counters are separate
         self.models["count"] = {}
 
+        # Models updated since the last snapshot, by (model, step, key)
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+        # Models that rules need, by step and key
+        self.mode = mode or defaults.metrics_mode
+        if self.mode not in defaults.metrics_modes:
+            raise ValueError(f"Metrics mode {self.mode} must be one of {defaults.metrics_modes}")
+        self.summary_models = set(summary_models or [])
+        self.required = {}
+        for rule in rules or []:
+            for condition in rule.conditions:
+                key = (condition.step_name, condition.key)
+                if key not in self.required:
+                    self.required[key] = set()
+                self.required[key].add(condition.model_name)
+
+    def get_model_names(self, key, step):
+        """
+        Get models to update for a metric, all of them unless we are lazy.
+        """
+        if self.mode != "lazy":
+            return list(model_inits)
+        needed = set(lazy_models) | self.summary_models | self.required.get((step, key), set())
+        return [name for name in model_inits if name in needed]
+
     def summarize_all(self):
         """
         Summarize all models
@@ -58,11 +104,13 @@ class WorkflowMetrics:
         """
         # No step is global for the entire workflow
         step = step or "global"
-        if step not in self.models["count"]:
-            self.models["count"][step] = {}
-        if key not in self.models["count"][step]:
-            self.models["count"][step][key] = stats.Count()
-        self.models["count"][step][key].update(by)
+        with self.lock:
+            if step not in self.models["count"]:
+                self.models["count"][step] = {}
+            if key not in self.models["count"][step]:
+                self.models["count"][step][key] = stats.Count()
+            self.models["count"][step][key].update(by)
+            self.dirty.add(("count", step, key))
 
     def add_custom_metric(self, metrics, job_name, step_name):
         """
@@ -71,7 +119,7 @@ class WorkflowMetrics:
         """
         LOGGER.info(f"Adding custom metrics for {job_name}")
 
-        # This adds variance, mean, max, min, iqr, and mad
+        # This adds variance, mean, max, min, iqr, mad, and percentiles (or those needed, if lazy)
         for metric_name, metric_value in metrics.items():
             self.add_model_entry(metric_name, metric_value, step=step_name)
             # Assume it could also be countable
@@ -81,18 +129,59 @@ class WorkflowMetrics:
         """
         Record a datum for one or more models.
 
-        If model_name is not set, add to add models.
+        If model_name is not set, add to all models (or those needed, if lazy).
         """
         step = step or "global"
 
         # This should be all models except for counts
-        model_names = list(model_inits)
+        model_names = self.get_model_names(key, step)
         if model_name is not None:
             model_names = [model_name]
 
-        for model_name in model_names:
+        with self.lock:
+            for model_name in model_names:
+                if step not in self.models[model_name]:
+                    self.models[model_name][step] = {}
+                if key not in self.models[model_name][step]:
+                    self.models[model_name][step][key] = model_inits[model_name]()
+                self.models[model_name][step][key].update(value)
+                self.dirty.add((model_name, step, key))
+
+    def snapshot(self):
+        """
+        Serialize models updated since the last snapshot, as (model, step, key, state).
+
+        Only the serialize is done under the lock, and it is bounded by the
+        number of models updated since the last snapshot.
+        """
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            states = [
+                (model_name, step, key, pickle.dumps(self.models[model_name][step][key]))
+                for model_name, step, key in dirty
+            ]
+        return [
+            (model_name, step, key, zlib.compress(state)) for model_name, step, key, state in states
+        ]
+
+    def mark_dirty(self, snapshot):
+        """
+        Mark models in a snapshot as updated again, e.g., if it was not saved.
+        """
+        with self.lock:
+            self.dirty.update((model_name, step, key) for model_name, step, key, _ in snapshot)
+
+    def restore(self, snapshot):
+        """
+        Restore models from a snapshot, e.g., on a restart.
+        """
+        count = 0
+        for model_name, step, key, state in snapshot:
+            if model_name not in self.models:
+                continue
             if step not in self.models[model_name]:
                 self.models[model_name][step] = {}
-            if key not in self.models[model_name][step]:
-                self.models[model_name][step][key] = model_inits[model_name]()
-            self.models[model_name][step][key].update(value)
+            self.models[model_name][step][key] = pickle.loads(zlib.decompress(state))
+            count += 1
+        if count:
+            LOGGER.info(f"Restored {count} metric models from snapshot")
@@ -0,0 +1,193 @@
+import math
+import random
+
+import state_machine_operator.defaults as defaults
+
+
+class DDSketch:
+    """
+    A streaming quantile sketch with bounded memory and relative accuracy.
+
+    Values are counted in buckets with logarithmic boundaries, so any quantile
+    is within the relative accuracy of the true value. The number of buckets
+    is bounded, and when we go over, the lowest buckets are collapsed (the
+    tail we care about for latency is the upper one). Two sketches with the
+    same accuracy can be merged, e.g., to combine metrics from managers.
+
+    https://www.vldb.org/pvldb/vol12/p2195-masson.pdf
+    """
+
+    def __init__(self, relative_accuracy=None, max_bins=None):
+        self.relative_accuracy = relative_accuracy or defaults.sketch_relative_accuracy
+        self.max_bins = max_bins or defaults.sketch_max_bins
+        self.gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        # Buckets for positive values, and negative values (by absolute value)
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def value(self, key):
+        """
+        The estimate for a bucket, within relative accuracy of any value in it.
+        """
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def update(self, value):
+        if value > defaults.sketch_min_value:
+            bins = self.positive
+            key = self.key(value)
+        elif value < -defaults.sketch_min_value:
+            bins = self.negative
+            key = self.key(-value)
+        else:
+            bins = None
+            self.zeros += 1
+
+        if bins is not None:
+            bins[key] = bins.get(key, 0) + 1
+            self.collapse()
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        return self
+
+    def collapse(self):
+        """
+        Collapse the lowest buckets into the next, until we are within max bins.
+        """
+        while len(self.positive) + len(self.negative) > self.max_bins:
+            # The lowest values are the largest negative keys, and then the smallest positive
+            if len(self.negative) > 1:
+                keys = sorted(self.negative, reverse=True)[:2]
+                bins = self.negative
+            elif self.negative:
+                self.zeros += self.negative.pop(next(iter(self.negative)))
+                continue
+            else:
+                keys = sorted(self.positive)[:2]
+                bins = self.positive
+            bins[keys[1]] += bins.pop(keys[0])
+
+    def merge(self, other):
+        """
+        Merge another sketch (with the same accuracy) into this one.
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches with a different relative accuracy cannot be merged")
+        for bins, others in [(self.positive, other.positive), (self.negative, other.negative)]:
+            for key, count in others.items():
+                bins[key] = bins.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        for value in [other.min, other.max]:
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+        self.collapse()
+        return self
+
+    def quantile(self, q):
+        """
+        Get the value at a quantile (between 0 and 1), or None if we have no values.
+        """
+        if not self.count:
+            return
+        rank = q * (self.count - 1)
+        seen = 0
+
+        # Negative values are ordered from largest absolute value
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return self.clamp(-self.value(key))
+        seen += self.zeros
+        if seen > rank:
+            return self.clamp(0)
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self.clamp(self.value(key))
+        return self.max
+
+    def clamp(self, value):
+        return max(self.min, min(self.max, value))
+
+
+class Percentile:
+    """
+    A percentile model (e.g., p95) backed by a sketch.
+
+    This has the same interface as a river stats model (update and get).
+    """
+
+    def __init__(self, percentile):
+        self.percentile = percentile
+        self.sketch = DDSketch()
+
+    def update(self, value):
+        self.sketch.update(value)
+        return self
+
+    def get(self):
+        return self.sketch.quantile(self.percentile / 100)
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        return self
+
+
+class Histogram:
+    """
+    A latency histogram with fixed memory.
+
+    We keep a count, sum, min and max, and percentiles from a sketch. Raw
+    samples are optional, and are a reservoir sample (a fixed number, with
+    each value equally likely to be kept) of all values.
+    """
+
+    def __init__(self, samples=0):
+        self.sketch = DDSketch()
+        self.total = 0
+        self.size = samples
+        self.samples = []
+
+    @property
+    def count(self):
+        return self.sketch.count
+
+    def update(self, value):
+        self.sketch.update(value)
+        self.total += value
+        if not self.size:
+            return self
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.size:
+                self.samples[index] = value
+        return self
+
+    def to_dict(self):
+        summary = {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+        }
+        for name in ["min", "max"]:
+            value = getattr(self.sketch, name)
+            summary[name] = round(value, 3) if value is not None else None
+        for percentile in [50, 90, 95, 99]:
+            value = self.sketch.quantile(percentile / 100)
+            summary[f"p{percentile}"] = round(value, 3) if value is not None else None
+        if self.size:
+            summary["samples"] = [round(x, 3) for x in self.samples]
+        return summary
@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+
+# Tables for state that is not encoded in job labels
+schema = """
+CREATE TABLE IF NOT EXISTS jobs (
+    jobid TEXT NOT NULL,
+    step TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (jobid, step)
+);
+CREATE TABLE IF NOT EXISTS sequences (
+    jobid TEXT PRIMARY KEY,
+    step TEXT NOT NULL,
+    repeat INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS steps (
+    step TEXT PRIMARY KEY,
+    nnodes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rules (
+    rule INTEGER PRIMARY KEY,
+    repetitions INTEGER,
+    backoff_counter INTEGER
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    model TEXT NOT NULL,
+    step TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (model, step, key)
+);
+"""
+
+
+class StateStore:
+    """
+    A local SQLite store for manager state, written as it changes.
+
+    The store has the job index (status by jobid and step), the step each
+    tracked job sequence is on (and if it is marked to repeat), changes to
+    the workflow config (nnodes after grow or shrink), rule state
+    (repetitions and backoff), and snapshots of metric models. A restarted
+    manager loads this state and only needs to handle jobs that changed
+    while it was down. The database is in WAL mode, so writes are appends
+    to the log and don't block a reader.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+        # Writes come from the thread that handles an event, which can vary (asyncio mode)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(schema)
+
+    def execute(self, sql, *args):
+        with self.lock:
+            self.conn.execute(sql, args)
+
+    def has_state(self):
+        """
+        Determine if the store has state from a previous run.
+        """
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is not None
+
+    def load(self):
+        """
+        Load all state, e.g., on a restart.
+        """
+        with self.lock:
+            jobs = self.conn.execute("SELECT jobid, step, status FROM jobs").fetchall()
+            sequences = self.conn.execute("SELECT jobid, step, repeat FROM sequences").fetchall()
+            steps = self.conn.execute("SELECT step, nnodes FROM steps").fetchall()
+            rules = self.conn.execute(
+                "SELECT rule, repetitions, backoff_counter FROM rules"
+            ).fetchall()
+        return {
+            "jobs": {(jobid, step): status for jobid, step, status in jobs},
+            "sequences": {jobid: (step, bool(repeat)) for jobid, step, repeat in sequences},
+            "steps": dict(steps),
+            "rules": {rule: (repetitions, counter) for rule, repetitions, counter in rules},
+        }
+
+    def set_job(self, jobid, step, status):
+        self.execute(
+            "INSERT OR REPLACE INTO jobs (jobid, step, status) VALUES (?, ?, ?)",
+            jobid,
+            step,
+            status,
+        )
+
+    def remove_job(self, jobid):
+        self.execute("DELETE FROM jobs WHERE jobid = ?", jobid)
+
+    def seed_jobs(self, jobs):
+        """
+        Replace the job index (jobid -> step -> status) in one transaction.
+        """
+        rows = [
+            (jobid, step, status) for jobid, steps in jobs.items() for step, status in steps.items()
+        ]
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.execute("DELETE FROM jobs")
+            self.conn.executemany("INSERT INTO jobs (jobid, step, status) VALUES (?, ?, ?)", rows)
+
+    def set_sequence(self, jobid, step, repeat=False):
+        self.execute(
+            "INSERT OR REPLACE INTO sequences (jobid, step, repeat) VALUES (?, ?, ?)",
+            jobid,
+            step,
+            int(repeat),
+        )
+
+    def remove_sequence(self, jobid):
+        self.execute("DELETE FROM sequences WHERE jobid = ?", jobid)
+
+    def set_nnodes(self, step, nnodes):
+        self.execute("INSERT OR REPLACE INTO steps (step, nnodes) VALUES (?, ?)", step, nnodes)
+
+    def set_rule(self, index, rule):
+        """
+        Save the state of a rule (by index in the workflow rules) after it is performed.
+        """
+        self.execute(
+            "INSERT OR REPLACE INTO rules (rule, repetitions, backoff_counter) VALUES (?, ?, ?)",
+            index,
+            rule.action.repetitions,
+            rule.action.backoff_counter,
+        )
+
+    def save_metrics(self, snapshot):
+        """
+        Save a snapshot of metric models (model, step, key, state) in one transaction.
+        """
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics (model, step, key, state) VALUES (?, ?, ?, ?)",
+                snapshot,
+            )
+
+    def load_metrics(self):
+        with self.lock:
+            return self.conn.execute("SELECT model, step, key, state FROM metrics").fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
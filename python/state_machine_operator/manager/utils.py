@@ -1,11 +1,47 @@
 import signal
+import threading
 import time
+from contextlib import contextmanager
 from functools import partial, update_wrapper
 
+from .sketch import Histogram
+
+
+class Timings:
+    """
+    Latency histograms (with fixed memory) by name, e.g., a timed function.
+    """
+
+    def __init__(self, samples=0):
+        self.samples = samples
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(self.samples)
+            self.histograms[name].update(seconds)
+
+    @contextmanager
+    def time(self, name):
+        """
+        Time a block of code, e.g., with timings.time("cleanup")
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, time.time() - start)
+
+    def to_dict(self):
+        with self.lock:
+            return {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+
 
 class timed:
     """
-    Time the runtime of a function, add to times
+    Time the runtime of a function, add to times (a Timings)
     """
 
     def __init__(self, func):
@@ -21,9 +57,7 @@ class timed:
         res = self.func(cls, *args, **kwargs)
         end = time.time()
         # Allow for more than one timing of a function
-        if name not in cls.times:
-            cls.times[name] = []
-        cls.times[name].append(round(end - start, 3))
+        cls.times.record(name, end - start)
         return res
 
 
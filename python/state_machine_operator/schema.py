@@ -12,6 +12,7 @@ state_machine_config_schema = {
         "cluster": {"$ref": "#/definitions/cluster"},
         "registry": {"$ref": "#/definitions/registry"},
         "logging": {"$ref": "#/definitions/logging"},
+        "manager": {"$ref": "#/definitions/manager"},
         "config_dir": {"type": "string"},
         "additionalProperties": False,
     },
@@ -22,14 +23,17 @@ state_machine_config_schema = {
             "properties": {
                 "completed": {"type": "number", "default": 4},
                 "prefix": {"type": "string"},
+                "label": {"type": "string"},
                 "events": {
                     "type": "array",
                     "items": {
                         "type": "object",
                         "properties": {
                             "action": {"type": "string"},
-                            "when": {"type": "string"},
+                            "when": {"type": ["string", "number"]},
                             "metric": {"type": "string"},
+                            "and": {"$ref": "#/definitions/conditions"},
+                            "or": {"$ref": "#/definitions/conditions"},
                             "minCompletions": {"type": ["number", "null"]},
                             "maxSize": {"type": ["number", "null"]},
                             "minSize": {"type": ["number", "null"]},
@@ -41,6 +45,18 @@ state_machine_config_schema = {
             },
             "additionalProperties": False,
         },
+        "conditions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["metric"],
+                "properties": {
+                    "metric": {"type": "string"},
+                    "when": {"type": ["string", "number"]},
+                },
+                "additionalProperties": False,
+            },
+        },
         "filesystem": {
             "type": "object",
             "properties": {
@@ -71,6 +87,29 @@ state_machine_config_schema = {
             },
             "additionalProperties": False,
         },
+        "manager": {
+            "type": "object",
+            "properties": {
+                "reconcile_seconds": {"type": "number", "default": 300},
+                "submit_workers": {"type": "number", "default": 10},
+                "submit_window": {"type": "number", "default": 64},
+                "event_workers": {"type": "number", "default": 16},
+                "flux_instances": {"type": "number", "default": 0},
+                "flux_instance_nodes": {"type": "number", "default": 1},
+                "resource_refresh_seconds": {"type": "number", "default": 10},
+                "log_workers": {"type": "number", "default": 8},
+                "metrics_mode": {"type": "string", "enum": ["full", "lazy"], "default": "full"},
+                "summary_models": {"type": "array", "items": {"type": "string"}},
+                "state_db": {"type": ["string", "null"]},
+                "metrics_snapshot_seconds": {"type": "number", "default": 30},
+                "timing_samples": {"type": "number", "default": 0},
+                "event_log_buffer": {"type": "number", "default": 1000},
+                "event_log_flush_seconds": {"type": "number", "default": 10},
+                "api_pool_size": {"type": "number", "default": 32},
+                "api_timeout": {"type": "number", "default": 60},
+            },
+            "additionalProperties": False,
+        },
         "jobs": {
             "type": ["array"],
             "items": {
@@ -0,0 +1,211 @@
+import collections
+import os
+import threading
+import time
+import types
+
+import pytest
+
+import state_machine_operator.machine.machine as machine
+import state_machine_operator.manager.manager as manager
+import state_machine_operator.tracker as tracker
+from state_machine_operator.config import load_workflow_config
+from state_machine_operator.tracker.job import BaseJob
+from state_machine_operator.tracker.types import JobSubmission, SubmissionCode
+
+workflow_config = """
+workflow:
+  completed: {completed}
+  prefix: "test_"
+cluster:
+  max_size: {max_size}
+jobs:
+- config: job_a.yaml
+- config: job_b.yaml
+"""
+
+job_config = """
+name: {name}
+config:
+  nnodes: 1
+image: rockylinux:9
+script: echo {name}
+"""
+
+
+class FakeJob(BaseJob):
+    """
+    A job event from the fake cluster.
+    """
+
+    def __init__(self, jobid, step_name, status):
+        self.job = None
+        self._jobid = jobid
+        self._step_name = step_name
+        self._status = status
+
+    @property
+    def jobid(self):
+        return self._jobid
+
+    @property
+    def step_name(self):
+        return self._step_name
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def label(self):
+        return f"{self.jobid}_{self.step_name}"
+
+    def is_active(self):
+        return self.status in ["queued", "running"]
+
+    def is_completed(self):
+        return self.status in ["success", "failed"]
+
+    def is_failed(self):
+        return self.status == "failed"
+
+    def is_succeeded(self):
+        return self.status == "success"
+
+    def duration(self):
+        if self.is_completed():
+            return 10
+
+
+class FakeCluster:
+    """
+    A fake cluster and tracker module. A submit queues events for the job
+    (queued, running, and then success, or failed for a step in fail_steps).
+    The event stream ends when there are no events, or after idle seconds
+    without one (for a manager that submits in another thread).
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.events = collections.deque()
+        self.submits = collections.Counter()
+        self.fail_steps = set()
+        self.idle_seconds = 0
+        self.lock = threading.Lock()
+
+        # Raise an error (a crash of the manager) after this many events
+        self.crash_after = None
+        cluster = self
+
+        class Tracker:
+            def __init__(self, step_name, workflow):
+                self.name = step_name
+                self.workflow = workflow
+                self.job_desc = workflow.get_job(step_name)
+                self.metrics = []
+
+            def submit_job(self, jobid, repeat=False):
+                return cluster.submit(jobid, self.name)
+
+            def submit_jobs(self, jobids, workers=None):
+                for jobid in jobids:
+                    yield jobid, self.submit_job(jobid)
+
+            def save_log(self, job=None):
+                pass
+
+            def cleanup(self, jobid=None):
+                pass
+
+        self.Tracker = Tracker
+
+    def submit(self, jobid, step_name):
+        result = "failed" if step_name in self.fail_steps else "success"
+        with self.lock:
+            self.submits[(jobid, step_name)] += 1
+            self.jobs[(jobid, step_name)] = "queued"
+            for status in ["queued", "running", result]:
+                self.events.append((jobid, step_name, status))
+        return JobSubmission(SubmissionCode.OK, 0)
+
+    def deliver(self, count=None):
+        """
+        Deliver queued events to the cluster (without a manager to see them).
+        """
+        while self.events and (count is None or count > 0):
+            jobid, step_name, status = self.events.popleft()
+            self.jobs[(jobid, step_name)] = status
+            count = None if count is None else count - 1
+
+    def list_jobs_by_status(self, *args, **kwargs):
+        states = {"success": [], "failed": [], "running": [], "queued": [], "unknown": []}
+        for (jobid, step_name), status in self.jobs.items():
+            states[status].append(FakeJob(jobid, step_name, status))
+        return states
+
+    def stream_events(self, *args, **kwargs):
+        last = time.time()
+        count = 0
+        while self.events or time.time() - last < self.idle_seconds:
+            if not self.events:
+                time.sleep(0.01)
+                continue
+            if self.crash_after is not None and count >= self.crash_after:
+                raise RuntimeError("The manager crashed")
+            count += 1
+            with self.lock:
+                jobid, step_name, status = self.events.popleft()
+                self.jobs[(jobid, step_name)] = status
+            last = time.time()
+            yield FakeJob(jobid, step_name, status)
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    """
+    A fake cluster, loaded as the tracker for any scheduler.
+    """
+    cluster = FakeCluster()
+    monkeypatch.setattr(tracker, "load", lambda name: cluster)
+    monkeypatch.setattr(tracker, "trackers", {})
+    monkeypatch.setattr(machine, "state_machines", {})
+
+    # The manager waits for extra files to write when the workflow is complete
+    monkeypatch.setattr(
+        manager, "time", types.SimpleNamespace(time=manager.time.time, sleep=lambda seconds: None)
+    )
+    return cluster
+
+
+@pytest.fixture
+def make_workflow(tmp_path):
+    """
+    Make a workflow with two steps (job_a and job_b) in a temporary directory.
+    """
+
+    def make_workflow(completed=4, max_size=2, **settings):
+        for name in ["job_a", "job_b"]:
+            with open(tmp_path / f"{name}.yaml", "w") as fd:
+                fd.write(job_config.format(name=name))
+        filename = tmp_path / "state-machine-workflow.yaml"
+        with open(filename, "w") as fd:
+            fd.write(workflow_config.format(completed=completed, max_size=max_size))
+        workflow = load_workflow_config(str(filename))
+        workflow.cfg["manager"] = settings
+        return workflow
+
+    return make_workflow
+
+
+@pytest.fixture
+def make_manager(tmp_path, cluster):
+    """
+    Make a workflow manager for a workflow, with the fake cluster.
+    """
+
+    def make_manager(workflow, cls=manager.WorkflowManager):
+        workdir = tmp_path / "out"
+        os.makedirs(workdir, exist_ok=True)
+        return cls(workflow, filesystem=True, workdir=str(workdir), quiet=True)
+
+    return make_manager
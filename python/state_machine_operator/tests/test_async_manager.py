@@ -0,0 +1,86 @@
+import collections
+import threading
+import time
+
+import pytest
+
+from state_machine_operator.manager.async_manager import AsyncWorkflowManager
+
+
+def record_events(manager):
+    """
+    Record events as they are accepted, by jobid.
+    """
+    events = collections.defaultdict(list)
+    accept_event = manager.accept_event
+
+    def record(job):
+        events[job.jobid].append((job.step_name, job.status))
+        return accept_event(job)
+
+    manager.accept_event = record
+    return events
+
+
+def test_async_manager(make_workflow, make_manager, cluster):
+    """
+    Events for a job sequence are handled in order, and the workflow completes.
+    """
+    cluster.idle_seconds = 2
+    workflow = make_workflow(completed=12, max_size=4, event_workers=4)
+    manager = make_manager(workflow, cls=AsyncWorkflowManager)
+    events = record_events(manager)
+    with pytest.raises(SystemExit):
+        manager.start()
+
+    assert manager.index.completed_count >= 12
+    assert all(count == 1 for count in cluster.submits.values())
+    expected = [
+        (step_name, status)
+        for step_name in ["job_a", "job_b"]
+        for status in ["queued", "running", "success"]
+    ]
+    for jobid, handled in events.items():
+        assert handled == expected[: len(handled)], jobid
+
+
+def test_async_post_completion_concurrent(make_workflow, make_manager, cluster):
+    """
+    Fetching logs (post completion) runs at the same time across sequences.
+    """
+    cluster.idle_seconds = 2
+    workflow = make_workflow(completed=8, max_size=4, event_workers=4)
+    manager = make_manager(workflow, cls=AsyncWorkflowManager)
+    lock = threading.Lock()
+    running = collections.Counter()
+    post_completion = manager.post_completion
+
+    def slow_post_completion(job, state_machine):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.1)
+        with lock:
+            running["now"] -= 1
+        return post_completion(job, state_machine)
+
+    manager.post_completion = slow_post_completion
+    with pytest.raises(SystemExit):
+        manager.start()
+    assert running["max"] > 1
+
+
+def test_async_error_raised(make_workflow, make_manager, cluster):
+    """
+    An error handling an event is raised by the loop, as it would be in sync mode.
+    """
+    cluster.idle_seconds = 2
+    workflow = make_workflow(completed=4, max_size=2)
+    manager = make_manager(workflow, cls=AsyncWorkflowManager)
+
+    def process_event(job, state_machine):
+        raise ValueError(f"Cannot process {job.jobid}")
+
+    manager.process_event = process_event
+    with pytest.raises(ValueError, match="Cannot process"):
+        manager.start()
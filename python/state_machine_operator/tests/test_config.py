@@ -0,0 +1,13 @@
+def test_label_stable(make_workflow):
+    """
+    The default label is from the prefix, and does not change with edits to the config.
+    """
+    workflow = make_workflow(completed=4)
+    assert workflow.label == "test"
+    assert make_workflow(completed=8, max_size=4).label == workflow.label
+
+
+def test_label_explicit(make_workflow):
+    workflow = make_workflow()
+    workflow.cfg["workflow"]["label"] = "lammps/run 1"
+    assert workflow.label == "lammps-run-1"
@@ -0,0 +1,41 @@
+import json
+
+from state_machine_operator.tracker.eventlog import EventLog
+
+
+def read_events(filename):
+    if not filename.exists():
+        return []
+    return [json.loads(line) for line in filename.read_text().splitlines()]
+
+
+def test_record_buffers(tmp_path):
+    """
+    Events are buffered, and appended when the buffer is full.
+    """
+    filename = tmp_path / "events.jsonl"
+    log = EventLog(str(filename), buffer_size=3)
+    log.record("submit", timestamp=1, jobid="job_1")
+    log.record("start", timestamp=2, jobid="job_1")
+    assert read_events(filename) == []
+    log.record("finish", timestamp=3, jobid="job_1")
+    events = read_events(filename)
+    assert [event["event"] for event in events] == ["submit", "start", "finish"]
+    assert events[0] == {"event": "submit", "timestamp": 1, "jobid": "job_1"}
+    assert log.buffer == []
+
+
+def test_flush_appends(tmp_path):
+    """
+    A flush (or stop) writes what is buffered, and the file is appended to.
+    """
+    filename = tmp_path / "events.jsonl"
+    log = EventLog(str(filename), buffer_size=100)
+    log.record("submit", jobid="job_1")
+    log.flush()
+    log.flush()
+    log.record("submit", jobid="job_2")
+    log.stop()
+    events = read_events(filename)
+    assert [event["jobid"] for event in events] == ["job_1", "job_2"]
+    assert all(event["timestamp"] > 0 for event in events)
@@ -0,0 +1,155 @@
+import pytest
+
+from state_machine_operator.manager.index import JobIndex
+
+from .conftest import FakeJob
+
+steps = ["job_a", "job_b"]
+
+
+def run_sequence(index, jobid, result="success"):
+    """
+    Move a job sequence through each step, as events would.
+    """
+    for step_name in steps:
+        for status in ["queued", "running", result]:
+            index.set_status(jobid, step_name, status)
+        if result != "success":
+            return
+
+
+def test_fold_completed_sequence():
+    index = JobIndex("job_b")
+    run_sequence(index, "job_1")
+    assert index.completed == {"job_1"}
+    assert index.completed_count == 1
+
+    index.fold("job_1", {"job_a": 10})
+    assert not index.completed
+    assert "job_1" not in index.jobs
+    assert index.completed_count == 1
+    assert index.tombstones["job_1"].durations == {"job_a": 10}
+
+    # An event delivered again for the sequence is skipped
+    index.update(FakeJob("job_1", "job_b", "success"))
+    index.fold("job_1")
+    assert "job_1" not in index.jobs
+    assert index.completed_count == 1
+
+
+def test_fold_tombstone_evicted():
+    """
+    Events for folded sequences are not counted again after tombstones are evicted.
+    """
+    index = JobIndex("job_b", tombstones=2)
+    for i in range(5):
+        run_sequence(index, f"job_{i}")
+        index.fold(f"job_{i}")
+    assert list(index.tombstones) == ["job_3", "job_4"]
+
+    # Events are delivered again, e.g., a replay after a restart
+    for i in range(5):
+        for step_name in steps:
+            index.update(FakeJob(f"job_{i}", step_name, "success"))
+    assert index.completed_count == 5
+    assert not index.jobs
+    assert not index.active
+
+
+def test_fold_only_completed():
+    index = JobIndex("job_b")
+    run_sequence(index, "job_1", result="failed")
+    index.fold("job_1")
+    assert index.failed == {"job_1"}
+    assert index.completed_count == 0
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_memory_flat(count):
+    """
+    The index does not grow with the number of completed sequences.
+    """
+    index = JobIndex("job_b", tombstones=50)
+    for i in range(count):
+        jobid = f"job_{i}"
+        run_sequence(index, jobid)
+        index.fold(jobid)
+    assert index.completed_count == count
+    assert not index.jobs
+    assert not index.completed
+    assert len(index.tombstones) == 50
+    assert list(index.tombstones)[-1] == f"job_{count - 1}"
+
+
+def test_manager_memory_flat(make_workflow, make_manager, cluster):
+    """
+    A manager only keeps state machines for sequences in flight.
+    """
+    workflow = make_workflow(completed=30, max_size=3)
+    manager = make_manager(workflow)
+    manager.index.tombstones_size = 10
+    with pytest.raises(SystemExit):
+        manager.start()
+    assert manager.index.completed_count == 30
+    assert len(manager.trackers) <= 3
+    assert len(manager.index.jobs) <= 3
+    assert len(manager.index.tombstones) == 10
+
+
+def test_manager_replay(make_workflow, make_manager, cluster):
+    """
+    A restarted manager does not count completions again from replayed events.
+    """
+    workflow = make_workflow(completed=8, max_size=2)
+    with pytest.raises(SystemExit):
+        make_manager(workflow).start()
+
+    # The restart folds every completed sequence, and we replay all events
+    manager = make_manager(make_workflow(completed=16, max_size=2))
+    manager.index.tombstones_size = 2
+    manager.init_state()
+    assert manager.index.completed_count == 8
+    for (jobid, step_name), status in list(cluster.jobs.items()):
+        manager.accept_event(FakeJob(jobid, step_name, status))
+    assert manager.index.completed_count == 8
+    assert not manager.index.completed
+
+
+def test_seed_and_assess():
+    jobs = {
+        "success": [FakeJob("job_1", "job_a", "success"), FakeJob("job_1", "job_b", "success")],
+        "running": [FakeJob("job_2", "job_b", "running")],
+        "queued": [FakeJob("job_3", "job_a", "queued")],
+        "failed": [FakeJob("job_4", "job_a", "failed")],
+        "unknown": [FakeJob(None, "job_a", "unknown")],
+    }
+    index = JobIndex("job_b")
+    index.seed(jobs)
+    assert index.completed == {"job_1"}
+    assert index.active == {"job_2", "job_3"}
+    assert index.failed == {"job_4"}
+    assert None not in index.jobs
+    assert not index.is_stale(60)
+
+
+def test_update():
+    index = JobIndex("job_b")
+    assert index.is_stale(60)
+
+    # Events are only for sequences the index has (e.g., from a submit)
+    index.update(FakeJob("job_1", "job_a", "queued"))
+    assert not index.jobs
+    index.set_status("job_1", "job_a", "queued")
+    assert index.active == {"job_1"}
+
+    # A succeeded step that is not the last is still active
+    index.update(FakeJob("job_1", "job_a", "success"))
+    assert index.active == {"job_1"}
+    index.update(FakeJob("job_1", "job_b", "failed"))
+    assert index.failed == {"job_1"}
+    assert not index.active
+    assert index.get_status("job_1", "job_b") == "failed"
+
+    index.remove("job_1")
+    assert not index.failed
+    assert index.get_status("job_1", "job_a") is None
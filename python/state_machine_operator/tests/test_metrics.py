@@ -0,0 +1,85 @@
+import pytest
+
+from state_machine_operator.config.types import Rule
+from state_machine_operator.manager.metrics import WorkflowMetrics, model_inits
+
+
+def test_full_metrics():
+    metrics = WorkflowMetrics()
+    metrics.add_model_entry("duration", 10, step="job_a")
+    for model_name in model_inits:
+        assert metrics.models[model_name]["job_a"]["duration"].get() is not None
+
+
+def test_lazy_metrics():
+    rules = [
+        Rule({"action": "grow", "metric": "p95.job_a.duration", "when": ">10"}),
+        Rule(
+            {
+                "action": "shrink",
+                "and": [
+                    {"metric": "max.job_b.duration", "when": ">10"},
+                    {"metric": "iqr.job_b.duration", "when": ">1"},
+                ],
+            }
+        ),
+    ]
+    metrics = WorkflowMetrics("lazy", rules, summary_models=["min"])
+    assert metrics.get_model_names("duration", "job_a") == ["mean", "min", "p95"]
+    assert metrics.get_model_names("duration", "job_b") == ["mean", "iqr", "max", "min"]
+    assert metrics.get_model_names("other", "job_a") == ["mean", "min"]
+
+    metrics.add_model_entry("duration", 10, step="job_a")
+    assert "job_a" in metrics.models["p95"]
+    assert "job_a" not in metrics.models["mad"]
+
+    # Counters are always kept
+    metrics.increment_counter("success", step="job_a")
+    assert metrics.models["count"]["job_a"]["success"].get() == 1
+
+
+def test_metrics_mode_invalid():
+    with pytest.raises(ValueError):
+        WorkflowMetrics("sometimes")
+
+
+def test_snapshot_restore():
+    """
+    A snapshot only has models updated since the last one, and restores them.
+    """
+    metrics = WorkflowMetrics("lazy")
+    for value in [1, 2, 3]:
+        metrics.add_model_entry("duration", value, step="job_a")
+        metrics.increment_counter("success", step="job_a")
+    snapshot = metrics.snapshot()
+    assert sorted(x[:3] for x in snapshot) == [
+        ("count", "job_a", "success"),
+        ("mean", "job_a", "duration"),
+    ]
+    assert metrics.snapshot() == []
+
+    restored = WorkflowMetrics("lazy")
+    restored.restore(snapshot)
+    assert restored.models["mean"]["job_a"]["duration"].get() == 2
+    assert restored.models["count"]["job_a"]["success"].get() == 3
+
+
+def test_snapshot_failed_save(make_workflow, make_manager, cluster, tmp_path):
+    """
+    Models from a snapshot that was not saved are in the next snapshot.
+    """
+    manager = make_manager(make_workflow(state_db=str(tmp_path / "state.db")))
+    manager.metrics.add_model_entry("duration", 10, step="job_a", model_name="mean")
+
+    def save_metrics(snapshot):
+        raise RuntimeError("database is locked")
+
+    store_save_metrics = manager.store.save_metrics
+    manager.store.save_metrics = save_metrics
+    manager.save_metrics()
+    assert ("mean", "job_a", "duration") in manager.metrics.dirty
+
+    manager.store.save_metrics = store_save_metrics
+    manager.save_metrics()
+    assert not manager.metrics.dirty
+    assert [row[:3] for row in manager.store.load_metrics()] == [("mean", "job_a", "duration")]
@@ -0,0 +1,119 @@
+import pytest
+
+
+def make_restart(make_workflow, make_manager, tmp_path):
+    """
+    Make a manager with a state store, as on a first start or a restart.
+    """
+    state_db = str(tmp_path / "state.db")
+
+    def make():
+        return make_manager(make_workflow(completed=6, max_size=2, state_db=state_db))
+
+    return make
+
+
+@pytest.mark.parametrize("down_events", [0, 5, 12])
+def test_restart(make_workflow, make_manager, cluster, tmp_path, down_events):
+    """
+    A restarted manager picks up where it was, with no duplicate submits.
+    """
+    make = make_restart(make_workflow, make_manager, tmp_path)
+    cluster.crash_after = 10
+    with pytest.raises(RuntimeError):
+        make().start()
+
+    # Jobs change while the manager is down
+    cluster.deliver(down_events)
+    cluster.crash_after = None
+    manager = make()
+    with pytest.raises(SystemExit):
+        manager.start()
+    assert manager.index.completed_count >= 6
+    assert all(count == 1 for count in cluster.submits.values())
+
+
+def test_restore_trackers(make_workflow, make_manager, cluster, tmp_path):
+    """
+    State machines are restored at the step they were on.
+    """
+    make = make_restart(make_workflow, make_manager, tmp_path)
+    cluster.crash_after = 4
+    with pytest.raises(RuntimeError):
+        make().start()
+    manager = make()
+    manager.init_state()
+    assert len(manager.trackers) == 2
+    for jobid, state_machine in manager.trackers.items():
+        submitted = [step for step in ["job_a", "job_b"] if (jobid, step) in cluster.submits]
+        assert state_machine.current_state.id == submitted[-1]
+    assert all(count == 1 for count in cluster.submits.values())
+
+
+def test_restart_after_accept(make_workflow, make_manager, cluster, tmp_path, monkeypatch):
+    """
+    A job marked succeeded in the index, where we crashed before the next
+    step was submitted, is handled again on restart.
+    """
+    make = make_restart(make_workflow, make_manager, tmp_path)
+    manager = make()
+
+    def process_event(job, state_machine):
+        raise RuntimeError("The manager crashed")
+
+    manager.process_event = process_event
+    with pytest.raises(RuntimeError):
+        manager.start()
+
+    # The first success was accepted (in the index) but not processed
+    jobid = next(jobid for (jobid, _), status in cluster.jobs.items() if status == "success")
+    assert manager.index.get_status(jobid, "job_a") == "success"
+    assert (jobid, "job_b") not in cluster.submits
+
+    manager = make()
+    with pytest.raises(SystemExit):
+        manager.start()
+    assert cluster.submits[(jobid, "job_b")] == 1
+    assert all(count == 1 for count in cluster.submits.values())
+
+
+def test_restart_after_submit(make_workflow, make_manager, cluster, tmp_path):
+    """
+    A sequence that was submitted to the next step, but not saved, is
+    restored at the next step.
+    """
+    make = make_restart(make_workflow, make_manager, tmp_path)
+    manager = make()
+    cluster.crash_after = 3
+    with pytest.raises(RuntimeError):
+        manager.start()
+
+    # Move a sequence to the next step, as if we crashed before saving it
+    jobid = next(x for x, y in manager.trackers.items() if y.current_state.id == "job_a")
+    manager.trackers[jobid].mark_succeeded()
+    manager.trackers[jobid].change()
+    manager.store.set_sequence(jobid, "job_a")
+    assert cluster.submits[(jobid, "job_b")] == 1
+
+    manager = make()
+    manager.init_state()
+    assert manager.trackers[jobid].current_state.id == "job_b"
+    assert manager.store.load()["sequences"][jobid] == ("job_b", False)
+
+
+def test_restore_metrics(make_workflow, make_manager, cluster, tmp_path):
+    """
+    Metric models from the last snapshot are restored, so rules don't start from zero.
+    """
+    make = make_restart(make_workflow, make_manager, tmp_path)
+    manager = make()
+    cluster.crash_after = 9
+    with pytest.raises(RuntimeError):
+        manager.start()
+    manager.save_metrics()
+    count = manager.metrics.models["count"]["job_a"]["success"].get()
+    assert count > 0
+
+    manager = make()
+    assert manager.metrics.models["count"]["job_a"]["success"].get() == count
+    assert manager.metrics.models["mean"]["job_a"]["duration"].get() == 10
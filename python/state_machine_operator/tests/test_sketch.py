@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from state_machine_operator.manager.sketch import DDSketch, Histogram, Percentile
+from state_machine_operator.manager.utils import Timings, timed
+
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+@pytest.mark.parametrize("q", [0, 0.5, 0.9, 0.95, 0.99, 1])
+def test_quantile_accuracy(q):
+    """
+    A quantile is within the relative accuracy of the exact value.
+    """
+    rng = random.Random(42)
+    values = [rng.lognormvariate(0, 2) for _ in range(10000)]
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.update(value)
+    expected = exact_quantile(values, q)
+    assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+
+
+def test_negative_and_zero():
+    sketch = DDSketch()
+    for value in [-10, -1, 0, 0, 1, 10]:
+        sketch.update(value)
+    assert sketch.count == 6
+    assert sketch.zeros == 2
+    assert sketch.quantile(0) == -10
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(1) == 10
+
+
+def test_empty():
+    assert DDSketch().quantile(0.5) is None
+    assert Percentile(95).get() is None
+
+
+def test_collapse():
+    """
+    The number of buckets is bounded, and the upper tail keeps its accuracy.
+    """
+    sketch = DDSketch(relative_accuracy=0.01, max_bins=64)
+    values = [1.1**i for i in range(500)]
+    for value in values:
+        sketch.update(value)
+    assert len(sketch.positive) <= 64
+    assert sketch.count == 500
+    assert sketch.quantile(0.99) == pytest.approx(exact_quantile(values, 0.99), rel=0.01)
+
+
+def test_merge():
+    rng = random.Random(7)
+    first = [rng.uniform(1, 100) for _ in range(1000)]
+    second = [rng.uniform(50, 500) for _ in range(1000)]
+    a = DDSketch()
+    b = DDSketch()
+    for value in first:
+        a.update(value)
+    for value in second:
+        b.update(value)
+    a.merge(b)
+    assert a.count == 2000
+    assert a.min == min(first)
+    assert a.max == max(second)
+    assert a.quantile(0.5) == pytest.approx(exact_quantile(first + second, 0.5), rel=0.01)
+
+    with pytest.raises(ValueError):
+        a.merge(DDSketch(relative_accuracy=0.05))
+
+
+def test_percentile():
+    p90 = Percentile(90)
+    for value in range(1, 101):
+        p90.update(value)
+    assert p90.get() == pytest.approx(90, rel=0.01)
+
+
+def test_histogram():
+    histogram = Histogram(samples=10)
+    for value in range(1, 1001):
+        histogram.update(value)
+    summary = histogram.to_dict()
+    assert summary["count"] == 1000
+    assert summary["sum"] == 500500
+    assert summary["mean"] == 500.5
+    assert (summary["min"], summary["max"]) == (1, 1000)
+    assert summary["p50"] == pytest.approx(500, rel=0.01)
+    assert len(summary["samples"]) == 10
+
+    # Without samples, we only keep the summary
+    histogram = Histogram()
+    histogram.update(1)
+    assert "samples" not in histogram.to_dict()
+
+
+def test_timings():
+    """
+    Timings keep one histogram per name, from a timed method or block.
+    """
+
+    class Worker:
+        def __init__(self):
+            self.times = Timings()
+
+        @timed
+        def work(self, value):
+            return value
+
+    worker = Worker()
+    for value in range(3):
+        assert worker.work(value) == value
+    with worker.times.time("block"):
+        pass
+    timings = worker.times.to_dict()
+    assert sorted(timings) == ["block", "work"]
+    assert timings["work"]["count"] == 3
+    assert timings["block"]["count"] == 1
@@ -0,0 +1,55 @@
+from state_machine_operator.config.types import Rule
+from state_machine_operator.manager.store import StateStore
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    assert not store.has_state()
+
+    store.seed_jobs(
+        {"job_1": {"job_a": "success", "job_b": "running"}, "job_2": {"job_a": "queued"}}
+    )
+    store.set_job("job_2", "job_a", "running")
+    store.set_job("job_3", "job_a", "failed")
+    store.remove_job("job_3")
+    store.set_sequence("job_1", "job_b")
+    store.set_sequence("job_2", "job_a", repeat=True)
+    store.set_sequence("job_3", "job_a")
+    store.remove_sequence("job_3")
+    store.set_nnodes("job_a", 4)
+
+    rule = Rule({"action": "grow", "metric": "count.job_a.success", "when": 1, "repetitions": 3})
+    rule.action.perform()
+    store.set_rule(0, rule)
+    assert store.has_state()
+    store.close()
+
+    # A new store (e.g., after a restart) loads the same state
+    store = StateStore(path)
+    state = store.load()
+    assert state["jobs"] == {
+        ("job_1", "job_a"): "success",
+        ("job_1", "job_b"): "running",
+        ("job_2", "job_a"): "running",
+    }
+    assert state["sequences"] == {"job_1": ("job_b", False), "job_2": ("job_a", True)}
+    assert state["steps"] == {"job_a": 4}
+    assert state["rules"] == {0: (2, 0)}
+
+
+def test_seed_replaces_jobs(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.seed_jobs({"job_1": {"job_a": "success"}})
+    store.seed_jobs({"job_2": {"job_a": "queued"}})
+    assert store.load()["jobs"] == {("job_2", "job_a"): "queued"}
+
+
+def test_metrics_round_trip(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.save_metrics([("mean", "job_a", "duration", b"one")])
+    store.save_metrics([("mean", "job_a", "duration", b"two"), ("max", "job_a", "duration", b"3")])
+    assert sorted(store.load_metrics()) == [
+        ("max", "job_a", "duration", b"3"),
+        ("mean", "job_a", "duration", b"two"),
+    ]
@@ -0,0 +1,126 @@
+import pytest
+
+from state_machine_operator.config.types import Condition, Rule, compile_when
+
+
+@pytest.mark.parametrize(
+    "when,value,expected",
+    [
+        (None, None, True),
+        (None, 3, True),
+        ("undefined", None, True),
+        ("undefined", 0, False),
+        (3, 3, True),
+        (3, 3.5, False),
+        (3, None, False),
+        (">3", 4, True),
+        (">3", 3, False),
+        (">= 3", 3, True),
+        ("<2.5", 2, True),
+        ("<=-1", -1, True),
+        ("==4", 4, True),
+        ("=4", 5, False),
+        (">3", None, False),
+    ],
+)
+def test_compile_when(when, value, expected):
+    assert compile_when(when)(value) == expected
+
+
+@pytest.mark.parametrize("when", ["bigger", "> three", ""])
+def test_compile_when_invalid(when):
+    with pytest.raises(ValueError):
+        compile_when(when)
+
+
+def test_condition():
+    condition = Condition("mean.job_a.duration", ">10")
+    assert (condition.model_name, condition.step_name, condition.key) == (
+        "mean",
+        "job_a",
+        "duration",
+    )
+    assert condition.check(11)
+    assert str(condition) == "mean.job_a.duration >10"
+
+    # The key can have periods
+    assert Condition("count.job_a.my.key").key == "my.key"
+    with pytest.raises(ValueError):
+        Condition("mean.duration")
+
+
+def test_rule():
+    rule = Rule({"action": "grow", "metric": "mean.job_a.duration", "when": ">10"})
+    assert rule.operator is None
+    assert rule.steps == {"job_a"}
+    assert rule.action_class == "workflow"
+    assert rule.evaluate({"mean.job_a.duration": 11})
+    assert not rule.evaluate({"mean.job_a.duration": 9})
+    assert not rule.evaluate({})
+
+    rule = Rule({"action": "repeat", "metric": "count.job_b.success", "when": 2})
+    assert rule.action_class == "state-machine"
+
+
+@pytest.mark.parametrize(
+    "operator,values,expected",
+    [
+        ("and", {"mean.job_a.duration": 11, "count.job_b.success": 3}, True),
+        ("and", {"mean.job_a.duration": 11, "count.job_b.success": 1}, False),
+        ("or", {"mean.job_a.duration": 1, "count.job_b.success": 3}, True),
+        ("or", {"mean.job_a.duration": 1, "count.job_b.success": 1}, False),
+    ],
+)
+def test_compound_rule(operator, values, expected):
+    conditions = [
+        {"metric": "mean.job_a.duration", "when": ">10"},
+        {"metric": "count.job_b.success", "when": ">=2"},
+    ]
+    rule = Rule({"action": "grow", operator: conditions})
+    assert rule.operator == operator
+    assert rule.steps == {"job_a", "job_b"}
+    assert rule.evaluate(values) == expected
+    assert str(rule).startswith("(mean.job_a.duration >10")
+
+
+def test_rule_invalid():
+    with pytest.raises(ValueError):
+        Rule({"action": "grow", "metric": "mean.job_a.duration", "when": "bigger"})
+    with pytest.raises(ValueError):
+        Rule({"action": "explode", "metric": "mean.job_a.duration", "when": ">1"})
+
+
+def test_rule_repetitions():
+    """
+    Triggering a rule performs the action, until it is out of repetitions.
+    """
+    rule = Rule(
+        {"action": "grow", "metric": "count.job_a.success", "when": ">=1", "repetitions": 2}
+    )
+    values = {"count.job_a.success": 1}
+    assert not rule.should_trigger({"count.job_a.success": 0})
+    assert rule.should_trigger(values)
+    assert rule.should_trigger(values)
+    assert not rule.should_trigger(values)
+    assert rule.action.repetitions == 0
+
+
+def test_get_rules(make_workflow):
+    workflow = make_workflow()
+    workflow.cfg["workflow"]["events"] = [
+        {"action": "grow", "metric": "mean.job_a.duration", "when": ">10"},
+        {"action": "repeat", "metric": "count.job_a.success", "when": 1},
+        {
+            "action": "shrink",
+            "or": [
+                {"metric": "mean.job_a.duration", "when": "<1"},
+                {"metric": "mean.job_b.duration", "when": "<1"},
+            ],
+        },
+    ]
+    workflow.load_events()
+    assert len(workflow.rules) == 3
+    assert [x.action.name for x in workflow.get_rules("job_a", "workflow")] == ["grow", "shrink"]
+    assert [x.action.name for x in workflow.get_rules("job_b", "workflow")] == ["shrink"]
+    assert [x.action.name for x in workflow.get_rules("job_a", "state-machine")] == ["repeat"]
+    assert workflow.get_rules("job_b", "state-machine") == []
@@ -2,6 +2,9 @@ import state_machine_operator.defaults as defaults
 
 from .watcher import Watcher
 
+# Step trackers are shared across state machines, one per workflow step
+trackers = {}
+
 
 def load(name):
     """
@@ -20,3 +23,16 @@ def load(name):
     if tracker is None:
         raise ValueError(f"Cannot match tracker to scheduler {name}")
     return tracker
+
+
+def get_tracker(name, step_name, workflow):
+    """
+    Get the shared tracker for a workflow step, creating it once.
+
+    A tracker (and the job adapter with any custom events module) does not
+    hold state for a job sequence, so all state machines can use the same one.
+    """
+    key = (name, step_name, id(workflow))
+    if key not in trackers:
+        trackers[key] = load(name).Tracker(step_name, workflow)
+    return trackers[key]
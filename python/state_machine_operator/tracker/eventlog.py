@@ -0,0 +1,65 @@
+import json
+import threading
+import time
+
+import state_machine_operator.defaults as defaults
+
+from .heartbeat import Heartbeat
+
+
+class EventLog:
+    """
+    An append-only log of workflow events, one JSON object per line.
+
+    Events (e.g., job timestamps and node condition changes) are buffered
+    in memory, and appended to the file when the buffer is full, or on a
+    heartbeat. The buffer has a fixed size, and a crash only loses events
+    since the last flush.
+    """
+
+    def __init__(self, filename, buffer_size=None, flush_seconds=None):
+        self.filename = filename
+        self.buffer_size = buffer_size or defaults.event_log_buffer
+        self.flush_seconds = flush_seconds or defaults.event_log_flush_seconds
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.heartbeat = None
+
+    def start(self):
+        """
+        Flush on a heartbeat, so events are written when they are few.
+        """
+        self.heartbeat = Heartbeat(self.flush_seconds, self.flush)
+        self.heartbeat.daemon = True
+        self.heartbeat.start()
+
+    def stop(self):
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+        self.flush()
+
+    def record(self, event, timestamp=None, **fields):
+        """
+        Record an event, with a timestamp (defaults to now) and any fields.
+        """
+        entry = {"event": event, "timestamp": timestamp or time.time(), **fields}
+        with self.lock:
+            self.buffer.append(json.dumps(entry))
+            if len(self.buffer) < self.buffer_size:
+                return
+            lines, self.buffer = self.buffer, []
+            self.write(lines)
+
+    def flush(self):
+        with self.lock:
+            lines, self.buffer = self.buffer, []
+            self.write(lines)
+
+    def write(self, lines):
+        """
+        Append lines to the file. This is done under the lock to keep lines in order.
+        """
+        if not lines:
+            return
+        with open(self.filename, "a") as fd:
+            fd.write("\n".join(lines) + "\n")
@@ -1,3 +1,5 @@
 from .event import stream_events
+from .instances import configure, shutdown
+from .resources import Resources
 from .state import list_jobs, list_jobs_by_status, queued_jobs, running_jobs
 from .tracker import FluxTracker as Tracker
@@ -0,0 +1,257 @@
+import collections
+import os
+import threading
+
+import flux
+import flux.job
+
+import state_machine_operator.defaults as defaults
+
+# Job state after an event, for events that change it
+event_states = {
+    "submit": "NEW",
+    "validate": "DEPEND",
+    "depend": "PRIORITY",
+    "priority": "SCHED",
+    "alloc": "RUN",
+    "start": "RUN",
+    "finish": "CLEANUP",
+    "clean": "INACTIVE",
+}
+
+# Job result for a fatal exception
+exception_results = {"cancel": "CANCELED", "timeout": "TIMEOUT"}
+
+
+class FluxidCache:
+    """
+    A bounded (least recently used) cache by Flux id.
+
+    A listing of jobs pins the ids in it: entries for jobs that are still
+    listed are never evicted, and entries for jobs that are no longer listed
+    (purged from the instance) are dropped. Beyond the listed jobs, we keep
+    up to size entries for jobs we have only seen in the journal.
+    """
+
+    def __init__(self, size=None):
+        self.size = size or defaults.jobspec_cache_size
+        self.entries = collections.OrderedDict()
+        self.listed = set()
+        self.lock = threading.Lock()
+
+    def __contains__(self, fluxid):
+        return fluxid in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, fluxid):
+        with self.lock:
+            if fluxid not in self.entries:
+                return
+            self.entries.move_to_end(fluxid)
+            return self.entries[fluxid]
+
+    def put(self, fluxid, value):
+        with self.lock:
+            self.entries[fluxid] = value
+            self.entries.move_to_end(fluxid)
+            self.evict(self.entries)
+
+    def evict(self, entries):
+        """
+        Evict the least recently used entries that are not listed. Call under the lock.
+        """
+        extra = len(entries) - self.size - len(self.listed)
+        if extra <= 0:
+            return
+        unlisted = [fluxid for fluxid in entries if fluxid not in self.listed]
+        for fluxid in unlisted[:extra]:
+            del entries[fluxid]
+
+    def drop_unlisted(self, entries):
+        for fluxid in [x for x in entries if x not in self.listed]:
+            del entries[fluxid]
+
+    def pin(self, fluxids):
+        """
+        Pin the ids from a listing, and drop entries for jobs that are not listed.
+        """
+        with self.lock:
+            self.listed = set(fluxids)
+            self.drop_unlisted(self.entries)
+
+
+class JobspecCache(FluxidCache):
+    """
+    A bounded cache of jobspecs by Flux id.
+
+    A jobspec does not change after submit, so we capture it from the journal
+    submit event, or read it from the KVS once if we did not see the submit.
+    We only keep the user attributes (what we use to identify a job). Jobs
+    that are not part of a state machine workflow are kept in a set of ids,
+    so we can skip them without reading the KVS again. The set is bounded
+    in the same way as the cache.
+    """
+
+    def __init__(self, size=None):
+        super().__init__(size)
+        self.foreign = collections.OrderedDict()
+
+    def __contains__(self, fluxid):
+        return fluxid in self.entries or fluxid in self.foreign
+
+    def get(self, fluxid):
+        if fluxid in self.foreign:
+            return
+        return super().get(fluxid)
+
+    def set(self, fluxid, jobspec):
+        """
+        Cache a jobspec, or note the id if the job is not part of the workflow.
+        """
+        if not is_workflow_jobspec(jobspec):
+            with self.lock:
+                self.foreign[fluxid] = None
+                self.foreign.move_to_end(fluxid)
+                self.evict(self.foreign)
+            return
+        jobspec = {"attributes": {"user": jobspec["attributes"]["user"]}}
+        self.put(fluxid, jobspec)
+        return jobspec
+
+    def pin(self, fluxids):
+        super().pin(fluxids)
+        with self.lock:
+            self.drop_unlisted(self.foreign)
+
+    def lookup(self, handle, fluxid):
+        """
+        Get the jobspec for one job, reading the KVS if we haven't yet.
+        """
+        if fluxid in self:
+            return self.get(fluxid)
+        return self.set(fluxid, flux.job.job_kvs(handle, fluxid).get("jobspec"))
+
+    def update(self, handle, fluxids):
+        """
+        Get jobspecs for a listing of jobs, reading those we don't have in one KVS lookup.
+
+        The listing pins the jobs, so a listing larger than the cache does
+        not evict (and read again) jobs that are still listed.
+        """
+        self.pin(fluxids)
+        found = {}
+        missing = []
+        for fluxid in fluxids:
+            if fluxid in self:
+                found[fluxid] = self.get(fluxid)
+            else:
+                missing.append(fluxid)
+        if not missing:
+            return found
+        rpc = flux.job.kvslookup.JobKVSLookup(
+            handle, ids=missing, keys=["jobspec"], decode=True, original=False, base=False
+        )
+        for job in rpc.data():
+            found[job["id"]] = self.set(job["id"], job.get("jobspec"))
+        return found
+
+
+class JobStates(FluxidCache):
+    """
+    Snapshots of job state by Flux id, updated from journal events.
+
+    A snapshot has the same fields we use from flux.job.get_job (state,
+    status, and returncode), so asking for the state of a job is a lookup
+    and not a call to the broker. A snapshot is replaced (not modified)
+    on each event, so a reader never sees one part way through an update.
+    Snapshots are bounded in the same way as jobspecs.
+    """
+
+    def set(self, fluxid, info):
+        """
+        Set a snapshot from job info (e.g., from get_job).
+        """
+        self.put(
+            fluxid,
+            {
+                "state": info["state"],
+                "status": info["status"],
+                "returncode": info.get("returncode"),
+                "exception": None,
+            },
+        )
+
+    def update(self, event):
+        """
+        Update the snapshot for a job from a journal event.
+        """
+        snapshot = dict(self.get(event.jobid) or {})
+        context = event.context or {}
+
+        # The job is new to us, the submit event is first in the journal
+        if not snapshot:
+            snapshot = {"state": "NEW", "status": "NEW", "returncode": None, "exception": None}
+
+        if event.name == "finish":
+            snapshot["returncode"] = get_returncode(context.get("status", 0))
+
+        # A fatal exception determines the result
+        elif event.name == "exception" and context.get("severity") == 0:
+            snapshot["exception"] = context.get("type")
+
+        snapshot["state"] = event_states.get(event.name, snapshot["state"])
+        snapshot["status"] = snapshot["state"]
+        if snapshot["state"] == "INACTIVE":
+            snapshot["status"] = get_result(snapshot)
+        self.put(event.jobid, snapshot)
+
+
+def get_returncode(waitstatus):
+    """
+    Get a returncode from a wait status, with 128 + signal if signaled.
+    """
+    if os.WIFSIGNALED(waitstatus):
+        return 128 + os.WTERMSIG(waitstatus)
+    return os.WEXITSTATUS(waitstatus)
+
+
+def get_result(snapshot):
+    """
+    Get the result of an inactive job, as the status from get_job would be.
+    """
+    if snapshot["exception"] is not None:
+        return exception_results.get(snapshot["exception"], "FAILED")
+    if snapshot["returncode"] == 0:
+        return "COMPLETED"
+    return "FAILED"
+
+
+def is_workflow_jobspec(jobspec):
+    """
+    Determine if a jobspec is for a state machine workflow job.
+    """
+    if not jobspec:
+        return False
+    user_data = jobspec.get("attributes", {}).get("user") or {}
+    return user_data.get("workflow") == "state-machine"
+
+
+# Jobspecs are shared by listings and events
+jobspecs = JobspecCache()
+
+# Job state snapshots are updated by events
+states = JobStates()
+
+# Flux ids are unique to an instance, so each child instance has its own caches
+caches = {None: (jobspecs, states)}
+
+
+def get_caches(uri=None):
+    """
+    Get the jobspec cache and job states for an instance, by URI.
+    """
+    if uri not in caches:
+        caches[uri] = (JobspecCache(), JobStates())
+    return caches[uri]
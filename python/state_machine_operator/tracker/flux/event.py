@@ -1,10 +1,9 @@
+import queue
+import threading
 from logging import getLogger
 
-import flux
-import flux.job
-
-from .handle import get_handle
 from .job import FluxJob as Event
+from .journal import get_journals
 
 LOGGER = getLogger(__name__)
 
@@ -25,16 +24,54 @@ skip_events = [
 # We use start and clean, as start is when the job actually starts, but clean is the last job event.
 
 
-def stream_events():
+def stream_events(workflow=None):
     """
     Stream jobs based on events.
 
-    A returned job object should be a generic job.
+    Flux jobs are scoped to the workflow by the jobspec user attributes,
+    so the workflow is not used.
+
+    A returned job object should be a generic job. The stream continues
+    from the journal after the history, which is read on start (if the
+    listing did not already). With child instances, each journal is read
+    in its own thread, and the events are combined.
     """
-    handle = get_handle()
-    consumer = flux.job.JournalConsumer(handle).start()
+    journals = get_journals()
+    for journal in journals:
+        journal.replay()
+
+    if len(journals) == 1:
+        yield from iter_events(journals[0])
+        return
+
+    events = queue.Queue()
+    for journal in journals:
+        threading.Thread(target=forward_events, args=(journal, events), daemon=True).start()
     while True:
-        event = consumer.poll(timeout=-1)
-        if event["name"] in skip_events:
+        event = events.get()
+        if isinstance(event, Exception):
+            raise event
+        yield event
+
+
+def iter_events(journal):
+    """
+    Iterate over live events from a journal.
+    """
+    while True:
+        event, jobspec = journal.poll()
+        if jobspec is None or event["name"] in skip_events:
             continue
-        yield Event(event)
+        yield Event(event, jobspec, uri=journal.uri)
+
+
+def forward_events(journal, events):
+    """
+    Forward events from a journal to a queue. An error is forwarded too.
+    """
+    try:
+        for event in iter_events(journal):
+            events.put(event)
+    except Exception as e:
+        LOGGER.error(f"Error reading journal for {journal.uri}: {e}")
+        events.put(e)
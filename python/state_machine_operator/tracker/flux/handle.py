@@ -1,15 +1,23 @@
 import sys
+import threading
 
 try:
     import flux
 except ImportError:
     sys.exit("flux python is required to use the flux tracker")
 
-handle = None
+# Handles by URI, where None is the instance we are running in. A handle is
+# not thread-safe, so each thread (e.g., an executor worker) has its own.
+local = threading.local()
 
 
-def get_handle():
-    global handle
-    if handle is None:
-        handle = flux.Flux()
-    return handle
+def get_handle(uri=None):
+    """
+    Get a handle to a Flux instance, by URI, or the one we are running in.
+    """
+    handles = getattr(local, "handles", None)
+    if handles is None:
+        handles = local.handles = {}
+    if uri not in handles:
+        handles[uri] = flux.Flux(uri) if uri else flux.Flux()
+    return handles[uri]
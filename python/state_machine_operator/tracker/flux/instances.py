@@ -0,0 +1,136 @@
+import os
+import zlib
+from logging import getLogger
+
+import flux
+import flux.constants
+import flux.job
+
+from .handle import get_handle
+
+LOGGER = getLogger(__name__)
+
+# The job name for a child instance
+instance_name = "state-machine-instance"
+
+
+class Instances:
+    """
+    Child Flux instances that job sequences are spread across.
+
+    Each child is a nested instance (like flux batch or flux alloc) that is
+    submitted to the instance we are running in. Scheduling work for steps
+    is then spread across the child brokers. Every step of a job sequence
+    goes to the same child, which we derive from the jobid, so we don't need
+    to save an assignment to restore it. Children that are already running
+    (e.g., on a restart of the manager) are reused, and are cancelled (with
+    any jobs still running in them) when the workflow is complete.
+    """
+
+    def __init__(self):
+        self.uris = []
+
+        # Lookup of uri -> Flux id (to cancel the instance)
+        self.fluxids = {}
+
+    def start(self, count, nodes=1):
+        """
+        Start (or find running) child instances, up to count.
+        """
+        if not count or self.uris:
+            return
+        handle = get_handle()
+        self.fluxids = dict(sorted(self.find(handle).items())[:count])
+        for _ in range(len(self.fluxids), count):
+            uri, fluxid = self.submit(handle, nodes)
+            self.fluxids[uri] = fluxid
+
+        # Sorted so a jobid maps to the same instance on a restart
+        self.uris = sorted(self.fluxids)
+        LOGGER.info(f"Workflow jobs are spread across {len(self.uris)} Flux instances")
+
+    def find(self, handle):
+        """
+        Find child instances that are running, by name. The uri is a job annotation.
+
+        We return a lookup of uri to Flux id (to cancel the instance).
+        """
+        listing = flux.job.job_list(
+            handle,
+            max_entries=0,
+            attrs=["id", "annotations"],
+            states=flux.constants.FLUX_JOB_STATE_RUNNING,
+            name=instance_name,
+        )
+        uris = {}
+        for info in listing.get()["jobs"]:
+            uri = (info.get("annotations") or {}).get("user", {}).get("uri")
+            if uri is not None:
+                uris[uri] = info["id"]
+        return uris
+
+    def submit(self, handle, nodes):
+        """
+        Submit a child instance and wait for it to be ready (to have a uri).
+
+        We return the uri and Flux id of the instance.
+        """
+        jobspec = flux.job.JobspecV1.from_nest_command(
+            command=["sleep", "inf"], num_slots=nodes, num_nodes=nodes, exclusive=True
+        )
+        jobspec.attributes["system"]["job"] = {"name": instance_name}
+        jobspec.cwd = os.getcwd()
+        fluxid = flux.job.submit(handle, jobspec)
+
+        # The instance posts its uri (a memo) when it is ready
+        for event in flux.job.event_watch(handle, fluxid):
+            if event.name == "memo" and "uri" in event.context:
+                return event.context["uri"], fluxid
+            if event.name == "exception" and event.context.get("severity") == 0:
+                raise ValueError(f"Flux instance {fluxid} failed to start: {event.context}")
+        raise ValueError(f"Flux instance {fluxid} did not report a uri")
+
+    def get_uri(self, jobid):
+        """
+        Get the uri for the instance a job sequence runs in, or None for ours.
+        """
+        if not self.uris:
+            return
+        return self.uris[zlib.crc32(jobid.encode()) % len(self.uris)]
+
+    def get_handle(self, jobid):
+        """
+        Get a handle to the instance a job sequence runs in.
+        """
+        return get_handle(self.get_uri(jobid))
+
+    def stop(self):
+        """
+        Cancel child instances, which cancels jobs still running in them.
+        """
+        handle = get_handle()
+        for uri, fluxid in self.fluxids.items():
+            try:
+                flux.job.cancel(handle, fluxid)
+            except Exception as e:
+                LOGGER.warning(f"Issue cancelling Flux instance {uri}: {e}")
+        self.uris = []
+        self.fluxids = {}
+
+
+# Child instances are shared by submit, listings, and events
+instances = Instances()
+
+
+def configure(workflow):
+    """
+    Start child instances, if the workflow asks for them.
+    """
+    instances.start(workflow.flux_instances, workflow.flux_instance_nodes)
+
+
+def shutdown():
+    """
+    Cancel child instances when the workflow is complete.
+    """
+    instances.stop()
@@ -3,17 +3,42 @@ import flux.job
 
 from state_machine_operator.tracker.job import BaseJob
 
+from .cache import get_caches
 from .handle import get_handle
 
-handle = get_handle()
+
+def get_status(info):
+    """
+    Derive the status group (success, failed, running, queued, unknown)
+    from Flux job info.
+    """
+    if info["status"] == "COMPLETED":
+        return "success"
+
+    # Failure means we finished with failed condition
+    if info["status"] == "FAILED":
+        return "failed"
+
+    # Pending or queued
+    if info["state"] in ["NEW", "DEPEND", "PRIORITY", "SCHED"]:
+        return "queued"
+
+    # Active and running
+    if info["state"] == "RUN":
+        return "running"
+
+    # If it didn't fail or succeed, let it keep going to timeout (duration/walltime)
+    return "unknown"
 
 
 class FluxJob(BaseJob):
     """
     An event wraps a job event.
+
+    The uri is for the (child) instance the job runs in, if not ours.
     """
 
-    def __init__(self, job):
+    def __init__(self, job, jobspec=None, uri=None):
         self.job = job
 
         # This is parsed from the state.py, slightly differently
@@ -21,19 +46,26 @@ class FluxJob(BaseJob):
         if "kvs" in self.job:
             jobspec = self.job["kvs"]["jobspec"]
             jobid = self.job["id"]
+            uri = self.job.get("uri")
+
+        # The jobspec from the cache (e.g., captured on submit)
+        elif jobspec is not None:
+            jobid = job.jobid
 
         elif hasattr(job, "jobspec") and job.jobspec is not None:
             jobspec = job.jobspec
             jobid = job.jobid
 
-        # If we don't have a jobspec, we need that too
+        # If we don't have a jobspec, we need that too (cached by Flux id)
         else:
-            jobspec = flux.job.job_kvs(handle, self.job.jobid).get("jobspec")
+            jobspecs, _ = get_caches(uri)
+            jobspec = jobspecs.lookup(get_handle(uri), job.jobid)
             jobid = job.jobid
 
         # Set the jobspec
         self.jobspec = jobspec
         self.fluxid = jobid
+        self.uri = uri
 
     @property
     def label(self):
@@ -44,6 +76,8 @@ class FluxJob(BaseJob):
         """
         Return the state machine job id
         """
+        if self.jobspec is None:
+            return
         return self.jobspec["attributes"]["user"].get("jobname")
 
     def fluxid(self):
@@ -51,14 +85,33 @@ class FluxJob(BaseJob):
 
     @property
     def step_name(self):
+        if self.jobspec is None:
+            return
         return self.jobspec["attributes"]["user"].get("app")
 
     @property
     def state(self):
         """
-        State must always be retrieved dynamically
+        State is the latest snapshot, updated from journal events.
+
+        A job from a listing already has its state. Otherwise, if we have
+        not seen an event for the job, we ask once and keep the snapshot.
+        """
+        _, states = get_caches(self.uri)
+        snapshot = states.get(self.fluxid)
+        if snapshot is not None:
+            return snapshot
+        if "kvs" in self.job:
+            return self.job
+        states.set(self.fluxid, flux.job.get_job(get_handle(self.uri), self.fluxid))
+        return states.get(self.fluxid)
+
+    @property
+    def status(self):
+        """
+        Status group of the job: success, failed, running, queued, or unknown
         """
-        return flux.job.get_job(handle, self.fluxid)
+        return get_status(self.state)
 
     def is_active(self):
         """
@@ -76,10 +129,10 @@ class FluxJob(BaseJob):
         """
         Determine if a job is failed
         """
-        return self.is_completed and self.state["returncode"] != 0
+        return self.is_completed() and self.state["returncode"] != 0
 
     def is_succeeded(self):
         """
         Determine if a job has succeeded
         """
-        return self.is_completed and self.state["returncode"] == 0
+        return self.is_completed() and self.state["returncode"] == 0
@@ -0,0 +1,110 @@
+from logging import getLogger
+
+import flux
+import flux.job
+
+from .cache import get_caches
+from .instances import instances
+from .job import FluxJob
+
+LOGGER = getLogger(__name__)
+
+
+class Journal:
+    """
+    One journal consumer shared by startup and the live event stream.
+
+    The consumer replays the job history (full=True) and then continues with
+    live events, with a sentinel event between the two. On startup we read
+    the history to seed the manager state, and the stream continues after
+    the sentinel with the same consumer, so no event is seen twice. Jobs that
+    are not part of the workflow are dropped as they are read.
+
+    A journal (for our instance, or a child by uri) has its own handle, since
+    the live stream is read in its own thread, and a handle is not shared
+    between threads. A child journal also has its own caches.
+    """
+
+    def __init__(self, uri=None):
+        self.uri = uri
+        self.handle = None
+        self.consumer = None
+        self.replayed = False
+        self.jobspecs, self.states = get_caches(uri)
+
+    def start(self):
+        if self.consumer is None:
+            self.handle = flux.Flux(self.uri) if self.uri else flux.Flux()
+            self.consumer = flux.job.JournalConsumer(
+                self.handle, full=True, include_sentinel=True
+            ).start()
+
+    def poll(self):
+        """
+        Get the next event for a workflow job, and the jobspec for it.
+
+        The sentinel (end of history) is returned with a jobspec of None.
+        """
+        self.start()
+        while True:
+            event = self.consumer.poll(timeout=-1)
+            if is_sentinel(event):
+                return event, None
+
+            # The submit event has the jobspec, and we don't need to ask for it
+            if event["name"] == "submit" and event.jobspec is not None:
+                self.jobspecs.set(event.jobid, event.jobspec)
+
+            # Drop jobs that are not part of the workflow before doing anything else.
+            # This only reads the KVS for a job we did not see submit (once)
+            jobspec = self.jobspecs.lookup(self.handle, event.jobid)
+            if jobspec is None:
+                continue
+
+            # Every event updates the job state, including those we skip
+            self.states.update(event)
+            return event, jobspec
+
+    def replay(self):
+        """
+        Replay the job history, up to the sentinel, and return workflow jobs.
+
+        Each job has the state from the last event in the history.
+        """
+        jobs = {}
+        if self.replayed:
+            return []
+        while True:
+            event, jobspec = self.poll()
+            if jobspec is None:
+                break
+            jobs[event.jobid] = FluxJob(event, jobspec, uri=self.uri)
+        self.replayed = True
+        LOGGER.info(f"Replayed journal history with {len(jobs)} workflow jobs {self.uri or ''}")
+        return list(jobs.values())
+
+
+def is_sentinel(event):
+    """
+    The sentinel marks the end of the history, and is not a job event.
+    """
+    return event.jobid == -1
+
+
+# The journal is shared by listings (on start) and events
+journal = Journal()
+
+# Journals for child instances, by uri
+journals = {}
+
+
+def get_journals():
+    """
+    Get the journals with workflow jobs: one per child instance, or our own.
+    """
+    if not instances.uris:
+        return [journal]
+    for uri in instances.uris:
+        if uri not in journals:
+            journals[uri] = Journal(uri)
+    return [journals[uri] for uri in instances.uris]
@@ -0,0 +1,114 @@
+import threading
+from logging import getLogger
+
+import flux
+import flux.resource
+
+from state_machine_operator.tracker.heartbeat import Heartbeat
+
+from .instances import instances
+
+LOGGER = getLogger(__name__)
+
+
+class Resources:
+    """
+    A live view of free resources (nodes and cores) in Flux.
+
+    The view is refreshed on a heartbeat, and used by the manager to only
+    submit new job sequences that can start now. Submitted jobs claim
+    resources from the view until they are allocated (the manager sees them
+    running or done), and a refresh subtracts claims that are still pending,
+    since Flux counts a job that is not scheduled yet as free. With child
+    instances, the view is the sum of free resources across them. The
+    heartbeat has its own handles, since a handle is not shared between threads.
+    """
+
+    def __init__(self, workflow):
+        self.interval = workflow.resource_refresh_seconds
+        self.handles = {}
+        self.free_nodes = None
+        self.free_cores = None
+
+        # Pending claims (nodes, cores) by jobid
+        self.claims = {}
+        self.lock = threading.Lock()
+        self.heartbeat = None
+
+    def start(self):
+        """
+        Get a first view of resources, and refresh on a heartbeat after.
+        """
+        self.refresh()
+        self.heartbeat = Heartbeat(self.interval, self.refresh)
+        self.heartbeat.daemon = True
+        self.heartbeat.start()
+
+    def stop(self):
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+
+    def refresh(self):
+        """
+        Refresh free nodes and cores, less pending claims. On error, we keep the last view.
+        """
+        nodes = 0
+        cores = 0
+        try:
+            for uri in instances.uris or [None]:
+                if uri not in self.handles:
+                    self.handles[uri] = flux.Flux(uri) if uri else flux.Flux()
+                free = flux.resource.resource_list(self.handles[uri]).get().free
+                nodes += free.nnodes
+                cores += free.ncores
+        except Exception as e:
+            LOGGER.warning(f"Issue refreshing Flux resources: {e}")
+            return
+        with self.lock:
+            self.free_nodes = nodes - sum(claim[0] for claim in self.claims.values())
+            self.free_cores = cores - sum(claim[1] for claim in self.claims.values())
+
+    def available(self, config):
+        """
+        Get the number of jobs (for a step config) that can start now.
+        """
+        nodes, cores = get_request(config)
+        with self.lock:
+            if self.free_nodes is None:
+                return
+            return max(0, min(self.free_nodes // nodes, self.free_cores // cores))
+
+    def claim(self, config, jobids):
+        """
+        Claim resources for jobs that were submitted, until they are allocated.
+        """
+        nodes, cores = get_request(config)
+        with self.lock:
+            for jobid in jobids:
+                self.claims[jobid] = (nodes, cores)
+            if self.free_nodes is None:
+                return
+            self.free_nodes -= nodes * len(jobids)
+            self.free_cores -= cores * len(jobids)
+
+    def release(self, jobid, allocated=True):
+        """
+        Release the claim for a job. If it was not allocated (e.g., it failed
+        to submit) the resources are free again.
+        """
+        with self.lock:
+            claim = self.claims.pop(jobid, None)
+            if claim is None or allocated or self.free_nodes is None:
+                return
+            self.free_nodes += claim[0]
+            self.free_cores += claim[1]
+
+
+def get_request(config):
+    """
+    Get the nodes and cores a job for a step config asks for.
+    """
+    nodes = max(1, int(config.get("nnodes", 1)))
+    tasks = max(1, int(config.get("tasks") or 1))
+    cores = tasks * max(1, int(config.get("cores_per_task", 1)))
+    return nodes, cores
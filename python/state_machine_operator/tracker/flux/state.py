@@ -2,12 +2,33 @@ from logging import getLogger
 
 import flux
 import flux.job
+import flux.job.info
 
+from .cache import get_caches
 from .handle import get_handle
 from .job import FluxJob as Job
+from .journal import get_journals
 
 LOGGER = getLogger(__name__)
 
+# Attributes needed from the job listing to derive status
+list_attrs = [
+    "state",
+    "result",
+    "success",
+    "waitstatus",
+    "exception_occurred",
+    "exception_type",
+    "exception_severity",
+    "exception_note",
+    "t_submit",
+    "t_run",
+    "t_cleanup",
+    "t_inactive",
+    "ranks",
+    "expiration",
+]
+
 
 def get_job_info(handle, jobid):
     """
@@ -17,40 +38,53 @@ def get_job_info(handle, jobid):
     return flux.job.get_job(handle, jobid)
 
 
-def list_jobs(*args, **kwargs):
+def list_jobs(*args, uri=None, **kwargs):
     """
     List jobs. Flux doesn't have namespaces, but we might replace
     with another abstraction (if it makes sense).
+
+    We request the attributes we need for all jobs in one call, and
+    only return jobs that are part of a state machine workflow. Jobspecs
+    are cached, so the KVS is read at most once per job. The uri is for
+    a child instance, if not ours.
     """
-    handle = get_handle()
-    listing = flux.job.job_list(handle)
-    ids = listing.get()["jobs"]
-    jobs = {}
-    flux_ids = []
-    for job in ids:
-        try:
-            jobinfo = get_job_info(handle, job["id"])
-            flux_ids.append(jobinfo["id"])
-
-            # This will trigger a data table warning
-            for needed in ["ranks", "expiration"]:
-                if needed not in jobinfo:
-                    jobinfo[needed] = ""
-            jobs[jobinfo["id"]] = jobinfo
-        except Exception:
-            pass
-
-    rpc = flux.job.kvslookup.JobKVSLookup(
-        handle, ids=flux_ids, keys=["jobspec"], decode=True, original=False, base=False
-    )
-    for job in rpc.data():
-        jobid = job["id"]
-        # Race between two calls
-        if jobid not in jobs:
+    handle = get_handle(uri)
+    jobspecs, states = get_caches(uri)
+    listing = flux.job.job_list(handle, max_entries=0, attrs=list_attrs)
+    infos = list(listing.get_jobinfos())
+
+    # Read jobspecs for jobs we haven't seen, in one lookup. Listed jobs are kept in the caches
+    fluxids = [info.id for info in infos]
+    found = jobspecs.update(handle, fluxids)
+    states.pin(fluxids)
+
+    jobs = []
+    for info in infos:
+        jobspec = found.get(info.id)
+
+        # Not a job in the workflow (or a race between the two calls)
+        if jobspec is None:
             continue
-        jobs[jobid]["kvs"] = job
+        jobs.append(to_dict(info, jobspec, uri))
+    return jobs
+
+
+def to_dict(info, jobspec, uri=None):
+    """
+    Convert a JobInfo from a listing to the same structure as get_job_info,
+    with the jobspec under kvs (and the uri of the instance).
+    """
+    jobinfo = info.to_dict()
+    if isinstance(jobinfo["state"], int):
+        jobinfo["state"] = flux.job.info.statetostr(jobinfo["state"])
 
-    return list(jobs.values())
+    # This will trigger a data table warning
+    for needed in ["ranks", "expiration"]:
+        if needed not in jobinfo:
+            jobinfo[needed] = ""
+    jobinfo["kvs"] = {"id": info.id, "jobspec": jobspec}
+    jobinfo["uri"] = uri
+    return jobinfo
 
 
 def queued_jobs(namespace=None):
@@ -96,7 +130,7 @@ def filter_jobs(jobs, label_key, label_value):
     """
     updated = []
     for job in jobs:
-        user_data = job["kvs"]["jobspec"]["attributes"].get("user")
+        user_data = job.jobspec["attributes"].get("user")
         if not user_data:
             continue
         if user_data.get(label_key) != label_value:
@@ -105,16 +139,24 @@ def filter_jobs(jobs, label_key, label_value):
     return updated
 
 
-def list_jobs_by_status(label_name="app", label_value=None):
+def list_jobs_by_status(label_name="app", label_value=None, workflow=None):
     """
     Return a lookup of jobs by status
 
-    If label is provided, filter down to that
-    """
-    jobs = list_jobs()
+    If label is provided, filter down to that. Flux jobs are scoped to the
+    workflow by the jobspec user attributes, so the workflow is not used.
 
-    # Only consider jobs that are part of this workflow
-    jobs = filter_jobs(jobs, "workflow", "state-machine")
+    The first listing (on start) replays the journal history, which the
+    event stream then continues from. After, we list jobs directly. With
+    child instances, there is a journal (and listing) for each.
+    """
+    # Only jobs that are part of this workflow are listed
+    jobs = []
+    for journal in get_journals():
+        if not journal.replayed:
+            jobs += journal.replay()
+        else:
+            jobs += [Job(job) for job in list_jobs(uri=journal.uri)]
 
     if label_name is not None and label_value is not None:
         jobs = filter_jobs(jobs, label_name, label_value)
@@ -122,25 +164,5 @@ def list_jobs_by_status(label_name="app", label_value=None):
     # These are the lists we will populate.
     states = {"success": [], "failed": [], "running": [], "queued": [], "unknown": []}
     for job in jobs:
-        if job["status"] == "COMPLETED":
-            states["success"].append(Job(job))
-            continue
-
-        # Failure means we finished with failed condition
-        if job["status"] == "FAILED":
-            states["failed"].append(Job(job))
-            continue
-
-        # Pending or queued
-        if job["state"] in ["NEW", "DEPEND", "PRIORITY", "SCHED"]:
-            states["queued"].append(Job(job))
-            continue
-
-        # Active and running
-        if job["state"] == "RUN":
-            states["running"].append(Job(job))
-            continue
-
-        # If it didn't fail or succeed, let it keep going to timeout (duration/walltime)
-        states["unknown"].append(Job(job))
+        states[job.status].append(job)
     return states
@@ -1,3 +1,4 @@
+import collections
 import os
 import shlex
 import sys
@@ -11,7 +12,7 @@ from state_machine_operator.tracker.tracker import BaseTracker, Job
 from state_machine_operator.tracker.types import JobSetup, JobSubmission, SubmissionCode
 from state_machine_operator.tracker.utils import convert_walltime_to_seconds
 
-from .handle import get_handle
+from .instances import instances
 
 LOGGER = getLogger(__name__)
 
@@ -32,9 +33,9 @@ class FluxJob(Job):
 
     def cleanup(self, jobid):
         """
-        Try cleaning up the entirety of a job
+        Try cleaning up the entirety of a job, in the instance it runs in
         """
-        flux.job.cancel(self.handle, jobid)
+        flux.job.cancel(instances.get_handle(jobid), jobid)
 
     def generate_flux_job(self, step, jobid):
         """
@@ -105,7 +106,7 @@ class FluxJob(Job):
         """
         # Generate the flux jobspec
         jobspec = self.generate_flux_job(step, jobid)
-        jobid = flux.job.submit(self.handle, jobspec)
+        jobid = flux.job.submit(instances.get_handle(jobid), jobspec)
         submit_status = SubmissionCode.ERROR
         retcode = -1
         if jobid is not None:
@@ -113,6 +114,42 @@ class FluxJob(Job):
             retcode = 0
         return JobSubmission(submit_status, retcode)
 
+    def submit_batch(self, steps, window):
+        """
+        Submit a batch of jobs with async submit futures.
+
+        Up to window submissions are in flight at once. We resolve the Flux
+        ids in the order submit, and yield the jobid and submit record for each.
+        Each job goes to the instance for its sequence (a child, or ours).
+        """
+        in_flight = collections.deque()
+        for jobid, step in steps.items():
+            try:
+                jobspec = self.generate_flux_job(step, jobid)
+                handle = instances.get_handle(jobid)
+                in_flight.append((jobid, flux.job.submit_async(handle, jobspec)))
+            except Exception as e:
+                LOGGER.error(f"Error submitting job {jobid}: {e}")
+                yield jobid, JobSubmission(SubmissionCode.ERROR, -1)
+
+            # Wait for the oldest submit when the window is full
+            if len(in_flight) >= window:
+                yield self.resolve_submit(*in_flight.popleft())
+
+        while in_flight:
+            yield self.resolve_submit(*in_flight.popleft())
+
+    def resolve_submit(self, jobid, future):
+        """
+        Resolve the Flux id for an async submit.
+        """
+        try:
+            future.get_id()
+            return jobid, JobSubmission(SubmissionCode.OK, 0)
+        except Exception as e:
+            LOGGER.error(f"Error submitting job {jobid}: {e}")
+            return jobid, JobSubmission(SubmissionCode.ERROR, -1)
+
 
 class FluxTracker(BaseTracker):
     """
@@ -124,8 +161,17 @@ class FluxTracker(BaseTracker):
 
     def __init__(self, job_name, workflow):
         super().__init__(job_name, workflow)
-        self.handle = get_handle()
-        self.adapter = FluxJob(self.job_desc, workflow, handle=self.handle)
+        self.adapter = FluxJob(self.job_desc, workflow)
+
+    def submit_jobs(self, jobids, workers=None):
+        """
+        Submit a batch of jobs. A Flux handle is not shared between threads,
+        so instead of workers we pipeline async submits on this thread's handle.
+        """
+        steps = {jobid: self.create_step(jobid) for jobid in jobids}
+        LOGGER.debug(f"[{self.type}] submitting {len(steps)} jobs")
+        for jobid, submit_record in self.adapter.submit_batch(steps, self.workflow.submit_window):
+            yield jobid, self.check_submission(steps[jobid], jobid, submit_record)
 
     def workdir(self, jobid):
         """
@@ -24,6 +24,13 @@ class BaseJob:
     def always_succeed(self):
         return False
 
+    @property
+    def status(self):
+        """
+        Status group of the job: success, failed, running, queued, or unknown
+        """
+        raise NotImplementedError
+
     def is_active(self):
         """
         Determine if a job is active
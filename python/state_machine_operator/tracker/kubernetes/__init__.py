@@ -1,3 +1,4 @@
+from .api import configure
 from .event import Watcher, stream_events
 from .state import get_namespace, list_jobs, list_jobs_by_status, queued_jobs, running_jobs
 from .tracker import KubernetesTracker as Tracker
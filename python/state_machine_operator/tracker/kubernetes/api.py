@@ -0,0 +1,72 @@
+import threading
+
+from kubernetes import client, config
+
+import state_machine_operator.defaults as defaults
+
+# This assumes the wfmanager running inside the cluster
+config.load_incluster_config()
+
+# Settings for the shared client, updated from the workflow config
+settings = {"pool_size": defaults.api_pool_size, "timeout": defaults.api_timeout}
+
+# One ApiClient is shared by the process, created on first use
+api_client = None
+lock = threading.Lock()
+
+
+class PooledApiClient(client.ApiClient):
+    """
+    A shared ApiClient with a connection pool sized for concurrent calls.
+
+    Connections (and TLS sessions) are kept alive in the pool and reused
+    across API calls. The timeout is used for any request that does not
+    set one.
+    """
+
+    def __init__(self, configuration, timeout=None):
+        super().__init__(configuration)
+        self.timeout = timeout
+
+    def request(self, *args, **kwargs):
+        if kwargs.get("_request_timeout") is None:
+            kwargs["_request_timeout"] = self.timeout
+        return super().request(*args, **kwargs)
+
+
+def configure(workflow):
+    """
+    Configure the shared client (pool size and timeout) from the workflow.
+    """
+    global api_client
+    with lock:
+        settings["pool_size"] = workflow.api_pool_size
+        settings["timeout"] = workflow.api_timeout
+
+        # A client created before is replaced on next use
+        api_client = None
+
+
+def get_api_client():
+    """
+    Get the shared ApiClient, creating it on first use.
+    """
+    global api_client
+    with lock:
+        if api_client is None:
+            configuration = client.Configuration.get_default_copy()
+            configuration.connection_pool_maxsize = settings["pool_size"]
+            api_client = PooledApiClient(configuration, timeout=settings["timeout"])
+        return api_client
+
+
+def get_batch_api():
+    return client.BatchV1Api(get_api_client())
+
+
+def get_core_api():
+    return client.CoreV1Api(get_api_client())
+
+
+def get_custom_objects_api():
+    return client.CustomObjectsApi(get_api_client())
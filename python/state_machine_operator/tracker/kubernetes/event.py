@@ -6,32 +6,101 @@ import time
 from logging import getLogger
 
 from kubernetes import client, config, watch
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
 
 import state_machine_operator.utils as utils
 
+from .api import get_batch_api, get_core_api
 from .job import Job
-from .utils import get_namespace
+from .state import has_unlabeled_jobs, list_workflow_jobs
+from .utils import get_label_selector, get_namespace, in_workflow
 
 LOGGER = getLogger(__name__)
 
 config.load_incluster_config()
 
 
-def stream_events():
+# Seconds for one watch request before we resume from the last resourceVersion
+watch_timeout_seconds = 300
+
+
+def stream_events(workflow=None):
     """
     Stream jobs based on events.
 
+    This is an informer-style stream. We list jobs once, and then watch from
+    the listed resourceVersion, resuming from the last version seen (updated
+    by bookmarks) when a watch times out, the server ends the stream, or the
+    connection drops. We only list again if the version has expired (410
+    Gone), and then only yield jobs that changed. If a workflow is provided,
+    we only list and watch jobs with the workflow label. If jobs without
+    the label remain (created before jobs were labeled) we watch all jobs
+    and filter to the workflow. We check again on each resume, and go back
+    to the label selector when they are gone.
+
     A returned job object should be a generic job.
     """
-    batch_v1 = client.BatchV1Api()
-    w = watch.Watch()
-    for event in w.stream(batch_v1.list_namespaced_job, namespace=get_namespace()):
-        job = event["object"]
-        # We are interested in created (ADDED) and MODIFIED, not DELETED
-        if event["type"] in ["DELETED"]:
+    batch_v1 = get_batch_api()
+    namespace = get_namespace()
+
+    # Like an informer, the initial listing delivers the current jobs
+    versions = {}
+    jobs, resource_version, unlabeled = list_workflow_jobs(workflow)
+    for job in jobs:
+        versions[job.metadata.name] = job.metadata.resource_version
+        yield Job(job)
+
+    while True:
+        # On each resume, scope the watch to the label when unlabeled jobs are gone
+        if unlabeled:
+            unlabeled = has_unlabeled_jobs(workflow)
+        label_selector = None if unlabeled else get_label_selector(workflow)
+        w = watch.Watch()
+        try:
+            for event in w.stream(
+                batch_v1.list_namespaced_job,
+                namespace=namespace,
+                resource_version=resource_version,
+                label_selector=label_selector,
+                allow_watch_bookmarks=True,
+                timeout_seconds=watch_timeout_seconds,
+                # The client must wait longer than the server side timeout
+                _request_timeout=watch_timeout_seconds + 30,
+            ):
+                job = event["object"]
+                resource_version = job.metadata.resource_version
+
+                # A bookmark only tells us the version to resume from
+                if event["type"] == "BOOKMARK":
+                    continue
+
+                # We are interested in created (ADDED) and MODIFIED, not DELETED
+                if event["type"] in ["DELETED"]:
+                    versions.pop(job.metadata.name, None)
+                    continue
+                if not in_workflow(job, workflow):
+                    continue
+                versions[job.metadata.name] = resource_version
+                yield Job(job)
+
+        # A dropped or timed out connection resumes from the last version seen
+        except (ReadTimeoutError, ProtocolError) as e:
+            LOGGER.info(f"Job watch connection ended ({e}), resuming from {resource_version}")
             continue
-        event = Job(job)
-        yield event
+
+        except client.exceptions.ApiException as e:
+            if e.status != 410:
+                raise
+
+            # The version is too old, list again and deliver what changed
+            LOGGER.info(f"Job watch resourceVersion {resource_version} expired, listing again")
+            jobs, resource_version, unlabeled = list_workflow_jobs(workflow)
+            seen = {}
+            for job in jobs:
+                seen[job.metadata.name] = job.metadata.resource_version
+                if versions.get(job.metadata.name) != job.metadata.resource_version:
+                    yield Job(job)
+            versions = seen
 
 
 class Watcher:
@@ -39,7 +108,7 @@ class Watcher:
     Kubernetes watchers deliver pod and node events.
     """
 
-    def __init__(self):
+    def __init__(self, events=None):
         self.threads = {}
         self.stop_event = threading.Event()
         self.prepare_watchers()
@@ -53,6 +122,9 @@ class Watcher:
         # The metrics watcher will append metrics to this queue.
         self.metrics = []
 
+        # Node changes are also streamed to the event log
+        self.events = events
+
     def results(self):
         return {"nodes": self.nodes}
 
@@ -135,24 +207,35 @@ class Watcher:
         node = event["object"]
         if node.metadata.name not in self.nodes:
             self.nodes[node.metadata.name] = self.new_node_event(node)
+            self.record_node_event("node_added", node, **self.nodes[node.metadata.name])
 
         # The node was deleted (so the object was too)
         if node.metadata.deletion_timestamp:
             self.nodes[node.metadata.name]["deleted"] = node.metadata.deletion_timestamp.timestamp()
+            self.record_node_event(
+                "node_deleted", node, deleted=self.nodes[node.metadata.name]["deleted"]
+            )
 
         # Has the node readiness changed? Only save conditions on changes
         ready = self.find_ready_condition(node)
         if self.nodes[node.metadata.name]["is_ready"] != ready["status"]:
             self.nodes[node.metadata.name]["conditions"].append(ready)
             self.nodes[node.metadata.name]["is_ready"] = ready["status"]
+            self.record_node_event("node_condition", node, condition=ready)
+
+    def record_node_event(self, event, node, **fields):
+        """
+        Record a node event to the event log, if we have one.
+        """
+        if self.events is not None:
+            self.events.record(event, node=node.metadata.name, **fields)
 
     def receive_metrics(self):
         """
         Receive metric events and pass to the manager.
         """
-        v1 = client.CoreV1Api()
-        w = watch.Watch()
-        for event in w.stream(v1.list_namespaced_event, namespace=get_namespace()):
+        v1 = get_core_api()
+        for event in self.stream(v1.list_namespaced_event, namespace=get_namespace()):
             e = event["object"]
             if e.reason == "CustomMetric":
                 print(f"Found custom metric event {e.message}")
@@ -163,16 +246,17 @@ class Watcher:
         """
         Collect list of nodes at experiment start, and then watch for changes.
         """
-        api = client.CoreV1Api()
+        api = get_core_api()
 
         # Get starting state of the cluster - we care about ready nodes, timestamps
-        for node in api.list_node().items:
+        nodes = api.list_node()
+        for node in nodes.items:
             self.nodes[node.metadata.name] = self.new_node_event(node)
+            self.record_node_event("node_added", node, **self.nodes[node.metadata.name])
 
         # For now, assume that nodes are added and removed.
         # https://github.com/kubernetes/kubernetes/blob/master/pkg/apis/core/types.go
-        w = watch.Watch()
-        for event in w.stream(api.list_node):
+        for event in self.stream(api.list_node, nodes.metadata.resource_version):
             try:
                 self.parse_node_event(event)
             except Exception as e:
@@ -180,5 +264,34 @@ class Watcher:
 
             # Stop event
             if self.stop_event.is_set():
-                w.stop()
                 return
+
+    def stream(self, list_func, resource_version=None, **kwargs):
+        """
+        Watch a resource, resuming from the last version seen when a watch ends.
+
+        The shared client has a short timeout for requests, so each watch
+        sets its own, and a watch with no events for a while is resumed.
+        """
+        while not self.stop_event.is_set():
+            w = watch.Watch()
+            try:
+                for event in w.stream(
+                    list_func,
+                    resource_version=resource_version,
+                    timeout_seconds=watch_timeout_seconds,
+                    _request_timeout=watch_timeout_seconds + 30,
+                    **kwargs,
+                ):
+                    resource_version = event["object"].metadata.resource_version
+                    yield event
+
+            except (ReadTimeoutError, ProtocolError) as e:
+                LOGGER.info(f"Watch connection ended ({e}), resuming from {resource_version}")
+
+            except client.exceptions.ApiException as e:
+                if e.status != 410:
+                    raise
+
+                # The version is too old, continue from now
+                resource_version = list_func(limit=1, **kwargs).metadata.resource_version
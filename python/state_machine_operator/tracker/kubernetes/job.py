@@ -1,9 +1,9 @@
-from kubernetes import client
-
 import state_machine_operator.defaults as defaults
 import state_machine_operator.utils as utils
 from state_machine_operator.tracker.job import BaseJob
 
+from .api import get_batch_api
+
 
 class Job(BaseJob):
     """
@@ -17,7 +17,7 @@ class Job(BaseJob):
         """
         Get an updated status for a job
         """
-        batch_v1 = client.BatchV1Api()
+        batch_v1 = get_batch_api()
         try:
             self.job = batch_v1.read_namespaced_job_status(
                 name=self.job.metadata.name, namespace=self.job.metadata.namespace
@@ -41,6 +41,39 @@ class Job(BaseJob):
     def always_succeed(self):
         return self.job.metadata.labels.get("always-succeed") in utils.true_values
 
+    @property
+    def status(self):
+        """
+        Status group of the job: success, failed, running, queued, or unknown
+        """
+        # These are *counts* of job indices, not boolean 0/1
+        succeeded = self.job.status.succeeded
+        failed = self.job.status.failed
+        active = self.job.status.active
+        not_active = active in [0, None]
+
+        # This is a completion time for the job
+        completion_time = self.job.status.completion_time
+
+        # Success means we finished with succeeded condition
+        if succeeded is not None and succeeded > 0 and completion_time is not None:
+            return "success"
+
+        # Failure means we finished with failed condition
+        if failed is not None and failed > 0:
+            return "failed"
+
+        # Not active, and not finished is queued
+        if not_active and not completion_time:
+            return "queued"
+
+        # Active, and not finished is running
+        if active and not completion_time:
+            return "running"
+
+        # If it didn't fail or succeed, let it keep going to timeout (duration/walltime)
+        return "unknown"
+
     def is_active(self):
         """
         Determine if a job is active
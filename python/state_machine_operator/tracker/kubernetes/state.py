@@ -1,9 +1,10 @@
 from logging import getLogger
 
-from kubernetes import client, config
+from kubernetes import config
 
+from .api import get_batch_api
 from .job import Job
-from .utils import get_namespace
+from .utils import get_label_selector, get_namespace
 
 LOGGER = getLogger(__name__)
 
@@ -11,13 +12,42 @@ LOGGER = getLogger(__name__)
 config.load_incluster_config()
 
 
-def list_jobs(namespace=None):
+def list_jobs(namespace=None, label_selector=None, limit=None):
     """
     List jobs. If no namespace is provided, use the current.
+
+    A label selector is applied server-side, so we only receive matching jobs.
     """
     namespace = namespace or get_namespace()
-    batch_api = client.BatchV1Api()
-    return batch_api.list_namespaced_job(namespace=namespace)
+    batch_api = get_batch_api()
+    return batch_api.list_namespaced_job(
+        namespace=namespace, label_selector=label_selector, limit=limit
+    )
+
+
+def list_workflow_jobs(workflow=None):
+    """
+    List jobs for a workflow, including unlabeled jobs (from before jobs were labeled).
+
+    We return the jobs, the resourceVersion of the listing, and if any of
+    the jobs are unlabeled (and would be missed by the label selector).
+    """
+    listing = list_jobs(label_selector=get_label_selector(workflow))
+    jobs = listing.items
+    unlabeled = []
+    if workflow is not None:
+        unlabeled = list_jobs(label_selector=get_label_selector(workflow, unlabeled=True)).items
+    return jobs + unlabeled, listing.metadata.resource_version, bool(unlabeled)
+
+
+def has_unlabeled_jobs(workflow=None):
+    """
+    Determine if any jobs are without the workflow label (we only need one).
+    """
+    if workflow is None:
+        return False
+    listing = list_jobs(label_selector=get_label_selector(workflow, unlabeled=True), limit=1)
+    return bool(listing.items)
 
 
 def queued_jobs(namespace=None):
@@ -44,51 +74,21 @@ def running_jobs(namespace=None):
     ]
 
 
-def list_jobs_by_status(label_name="app", label_value=None):
+def list_jobs_by_status(label_name="app", label_value=None, workflow=None):
     """
     Return a lookup of jobs by status
 
-    If label is provided, filter down to that
+    If label is provided, filter down to that. If a workflow is provided,
+    we only list jobs with the workflow label, or without a workflow label.
     """
-    jobs = list_jobs().items
+    jobs, _, _ = list_workflow_jobs(workflow)
 
     if label_name is not None and label_value is not None:
         jobs = [x for x in jobs if x.metadata.labels.get(label_name) == label_value]
 
     # These are the lists we will populate.
     states = {"success": [], "failed": [], "running": [], "queued": [], "unknown": []}
-
     for job in jobs:
-
-        # These are *counts* of job indices, not boolean 0/1
-        succeeded = job.status.succeeded
-        failed = job.status.failed
-        active = job.status.active
-        not_active = active in [0, None]
-
-        # This is a completion time for the job
-        completion_time = job.status.completion_time
-
-        # Success means we finished with succeeded condition
-        if succeeded is not None and succeeded > 0 and completion_time is not None:
-            states["success"].append(Job(job))
-            continue
-
-        # Failure means we finished with failed condition
-        if failed is not None and failed > 0:
-            states["failed"].append(Job(job))
-            continue
-
-        # Not active, and not finished is queued
-        if not_active and not completion_time:
-            states["queued"].append(Job(job))
-            continue
-
-        # Active, and not finished is running
-        if active and not completion_time:
-            states["running"].append(Job(job))
-            continue
-
-        # If it didn't fail or succeed, let it keep going to timeout (duration/walltime)
-        states["unknown"].append(Job(job))
+        job = Job(job)
+        states[job.status].append(job)
     return states
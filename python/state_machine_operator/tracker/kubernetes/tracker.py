@@ -2,6 +2,7 @@ import datetime
 import json
 import os
 import shlex
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 
 from jinja2 import Template
@@ -19,6 +20,9 @@ from state_machine_operator.tracker.types import (
 )
 from state_machine_operator.tracker.utils import convert_walltime_to_seconds
 
+from .api import get_batch_api, get_core_api, get_custom_objects_api
+from .utils import iter_lines, sort_pods, stream_pod_log
+
 LOGGER = getLogger(__name__)
 
 
@@ -54,16 +58,15 @@ class KubernetesJob(Job):
             metadata=client.V1ObjectMeta(name=name, namespace=self.namespace),
             data={"entrypoint": content, "config": config, "app-config": app_config},
         )
-        with client.ApiClient() as api_client:
-            api = client.CoreV1Api(api_client)
-            try:
-                api.create_namespaced_config_map(namespace=self.namespace, body=cm)
-            except Exception as e:
-                if e.reason == "Conflict":
-                    self.delete_configmap(name)
-                    return self.create_configmap(name, content)
-                else:
-                    raise ValueError(f"Unexpected error with configmap creation: {e.reason}")
+        api = get_core_api()
+        try:
+            api.create_namespaced_config_map(namespace=self.namespace, body=cm)
+        except Exception as e:
+            if e.reason == "Conflict":
+                self.delete_configmap(name)
+                return self.create_configmap(name, content)
+            else:
+                raise ValueError(f"Unexpected error with configmap creation: {e.reason}")
 
     def cleanup(self, jobid):
         """
@@ -76,7 +79,7 @@ class KubernetesJob(Job):
             LOGGER.warning(f"Issue cleaning up configmap {name}: {e}")
 
         # Use kubernetes API to cancel jobs (delete)
-        batch_api = client.BatchV1Api()
+        batch_api = get_batch_api()
 
         # Derive the job name
         step_name = self.job_desc["name"]
@@ -94,12 +97,11 @@ class KubernetesJob(Job):
         failure of the deletion, assuming a user / another
         entity deleted it first.
         """
-        with client.ApiClient() as api_client:
-            api = client.CoreV1Api(api_client)
-            try:
-                api.delete_namespaced_config_map(namespace=self.namespace, name=name)
-            except Exception as e:
-                LOGGER.warning(f"Issue deleting configmap {name}: {e}")
+        api = get_core_api()
+        try:
+            api.delete_namespaced_config_map(namespace=self.namespace, name=name)
+        except Exception as e:
+            LOGGER.warning(f"Issue deleting configmap {name}: {e}")
 
     def generate_resources(self, step):
         """
@@ -142,6 +144,23 @@ class KubernetesJob(Job):
         # Underscores are not allowed
         return (f"{step_name}-{step.name}").replace("_", "-")
 
+    def generate_labels(self, jobid):
+        """
+        Generate labels for a job (regular, JobSet, or MiniCluster).
+
+        The workflow label scopes listing and watching to this workflow.
+        """
+        labels = {
+            "app": self.job_desc["name"],
+            defaults.operator_label: jobid,
+            defaults.workflow_label: self.workflow.label,
+        }
+
+        # Should the job always succeed?
+        if self.always_succeed:
+            labels["always-succeed"] = "1"
+        return labels
+
     def generate_job_volumes(self, step):
         """
         Generate volumes for job (regular or JobSet)
@@ -200,10 +219,7 @@ class KubernetesJob(Job):
         # Job template. The app label will be used to filter later
         template = {
             "metadata": {
-                "labels": {
-                    "app": self.job_desc["name"],
-                    defaults.operator_label: jobid,
-                },
+                "labels": self.generate_labels(jobid),
             },
             "spec": {
                 "containers": [container],
@@ -213,10 +229,6 @@ class KubernetesJob(Job):
             },
         }
 
-        # Should the job always succeed?
-        if self.always_succeed:
-            template["metadata"]["labels"]["always-succeed"] = "1"
-
         # Add node selectors? E.g.,
         # node.kubernetes.io/instance-type: c7a.4xlarge
         node_selector = self.get_node_selector()
@@ -334,15 +346,7 @@ class KubernetesJob(Job):
         environ.append({"name": "jobname", "value": job_name})
         container.env = environ
 
-        labels = {
-            "app": self.job_desc["name"],
-            defaults.operator_label: jobid,
-        }
-
-        # Should the job always succeed?
-        if self.always_succeed:
-            labels["always-succeed"] = "1"
-
+        labels = self.generate_labels(jobid)
         replicated_job = {
             "name": "jobset",
             "replicas": 1,
@@ -377,7 +381,7 @@ class KubernetesJob(Job):
             },
         }
 
-        api_crd = client.CustomObjectsApi()
+        api_crd = get_custom_objects_api()
         retcode = -1
         # If we replace, delete it first.
         try:
@@ -417,7 +421,7 @@ class KubernetesJob(Job):
         """
         # Generate the kubernetes batch job!
         job = self.generate_batch_job(step, jobid)
-        batch_api = client.BatchV1Api()
+        batch_api = get_batch_api()
         retcode = -1
         try:
             if replace:
@@ -472,15 +476,7 @@ class KubernetesJob(Job):
             "resources": resources,
         }
 
-        labels = {
-            "app": self.job_desc["name"],
-            defaults.operator_label: jobid,
-        }
-
-        # Should the job always succeed?
-        if self.always_succeed:
-            labels["always-succeed"] = "1"
-
+        labels = self.generate_labels(jobid)
         spec = {
             "containers": [container],
             "jobLabels": labels,
@@ -507,7 +503,7 @@ class KubernetesJob(Job):
         }
 
         retcode = -1
-        crd_api = client.CustomObjectsApi()
+        crd_api = get_custom_objects_api()
         try:
             crd_api.create_namespaced_custom_object(
                 group="flux-framework.org",
@@ -530,9 +526,50 @@ class KubernetesJob(Job):
 
         return JobSubmission(submit_status, retcode)
 
-    def get_metric_events(self, pod, log):
+    @property
+    def log_window(self):
+        """
+        Limit the log read for parsing to a tail window (lines or bytes), if set.
+        """
+        window = {}
+        props = self.properties or {}
+        if props.get("log-tail-lines") is not None:
+            window["tail_lines"] = int(props["log-tail-lines"])
+        if props.get("log-limit-bytes") is not None:
+            window["limit_bytes"] = int(props["log-limit-bytes"])
+        return window
+
+    def read_log_lines(self, pod, log_file=None):
+        """
+        Iterate over lines of a pod log.
+
+        If the full log was already saved to file, we read it from there
+        instead of asking the API for it again.
+        """
+        window = self.log_window
+        if log_file and not window and os.path.exists(log_file):
+            return utils.read_lines(log_file)
+        return iter_lines(stream_pod_log(pod, **window))
+
+    def write_log(self, pod, log_file):
+        """
+        Stream a pod log to file, chunk by chunk.
+
+        We write to a temporary file first, so an error part way through
+        does not leave a partial log that looks already saved.
+        """
+        tmp_file = f"{log_file}.tmp"
+        with open(tmp_file, "wb") as fd:
+            for chunk in stream_pod_log(pod):
+                fd.write(chunk)
+        os.rename(tmp_file, log_file)
+
+    def get_metric_events(self, pod, log_file=None):
         """
         Send metric events to the manager. These events go to a custom watcher.
+
+        A custom module can define parse_log_lines to be given an iterator over
+        log lines, or parse_log to be given the log (or tail window) as a string.
         """
         # Cut out early if no special event parsing
         if not self.module:
@@ -540,7 +577,11 @@ class KubernetesJob(Job):
             return
 
         try:
-            events = self.module.parse_log(log)
+            lines = self.read_log_lines(pod, log_file)
+            if hasattr(self.module, "parse_log_lines"):
+                events = self.module.parse_log_lines(lines)
+            else:
+                events = self.module.parse_log("".join(lines))
         except Exception as e:
             print(f"Error parsing custom metric for {pod.metadata.name}: {e}")
             return
@@ -557,7 +598,7 @@ class KubernetesJob(Job):
 
         This function is currently not used.
         """
-        v1 = client.CoreV1Api()
+        v1 = get_core_api()
         now = datetime.datetime.utcnow()
         job_name = pod.metadata.labels["job-name"]
         job_uid = pod.metadata.labels["controller-uid"]
@@ -599,7 +640,7 @@ class KubernetesJob(Job):
             return CancelCode.OK
 
         # Use kubernetes API to cancel jobs (delete)
-        batch_api = client.BatchV1Api()
+        batch_api = get_batch_api()
 
         # I'm going to assume a failure to cancel here is OK.
         # Technically if the user cancelled it, it's fine. We can
@@ -637,21 +678,42 @@ class KubernetesTracker(BaseTracker):
             raise ValueError(
                 f"The 'image' attribute is required, and not present in {self.adapter.job_name}"
             )
+        if self.log_policy not in defaults.log_policies:
+            raise ValueError(f"log-policy {self.log_policy} must be one of {defaults.log_policies}")
+
+    @property
+    def log_policy(self):
+        """
+        Pods to read logs from: the lead pod, all pods, or none.
+
+        We default to all pods when logs are saved, and otherwise only
+        the lead pod (used for custom metrics).
+        """
+        policy = (self.properties or {}).get("log-policy")
+        if policy is None:
+            return "all" if self.save_path else "lead"
+        return policy
 
     def save_log(self, job=None):
         """
         Save a log identifier for a finished pod (job)
         """
         # No job, no purpose to save
-        if not job:
+        if not job or self.log_policy == "none":
             return
-        api = client.CoreV1Api()
+        api = get_core_api()
 
-        # Get pods associated with the job
+        # Get pods associated with the job. The lead pod is first
         selector = f"batch.kubernetes.io/job-name={job.job.metadata.name}"
-        pods = api.list_namespaced_pod(
-            label_selector=selector, namespace=job.job.metadata.namespace
-        ).items
+        pods = sort_pods(
+            api.list_namespaced_pod(
+                label_selector=selector, namespace=job.job.metadata.namespace
+            ).items
+        )
+        if self.log_policy == "lead":
+            pods = pods[:1]
+        if not pods:
+            return
 
         # Create the save path
         if self.save_path:
@@ -659,43 +721,45 @@ class KubernetesTracker(BaseTracker):
             if not os.path.exists(logs_path):
                 os.makedirs(logs_path)
 
-        # We might have one pod, but can't assume.
-        # For metrics, we assume logs coming from main (index 0) pod
-        # This can change if needed
-        for i, pod in enumerate(pods):
-            try:
-                log = api.read_namespaced_pod_log(
-                    name=pod.metadata.name,
-                    namespace=pod.metadata.namespace,
-                    follow=False,
-                    timestamps=True,
-                )
-                if i == 0:
-                    print(f"Saving log for {pod.metadata.name}")
-
-                    # We assume lead pod (index 0) is of interest
-                    metrics = self.adapter.get_metric_events(pod, log)
-                    if metrics:
-                        self.metrics.append(metrics)
+        # We might have one pod, but can't assume. Logs are fetched at the same time
+        # (bounded) and for metrics, we assume logs coming from the lead pod
+        workers = min(len(pods), self.workflow.log_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.save_pod_log, job, pod, i) for i, pod in enumerate(pods)
+            ]
+            results = [future.result() for future in futures]
 
-                # If we have metrics to send, send them for the manager to receive
-                if not self.save_path:
-                    continue
+        # Custom metrics are parsed from the log and returned
+        return results[0]
 
+    def save_pod_log(self, job, pod, index=0):
+        """
+        Save the log for one pod of a job, and parse metrics for the lead pod (index 0).
+        """
+        metrics = None
+        try:
+            log_file = None
+            if self.save_path:
                 log_file = os.path.join(
-                    logs_path,
-                    f"{job.job.metadata.labels['app']}-{job.job.metadata.labels['jobid']}-{i}.out",
+                    self.save_path,
+                    "logs",
+                    f"{job.job.metadata.labels['app']}-{job.job.metadata.labels['jobid']}-{index}.out",
                 )
                 # Don't write twice
                 if not os.path.exists(log_file):
                     print(f"Saving log file {log_file}")
-                    utils.write_file(log, log_file)
+                    self.adapter.write_log(pod, log_file)
                 else:
                     print(f"Log file {log_file} already exists")
 
-            except client.exceptions.ApiException as e:
-                print(f"Error getting logs: {e}")
-                return
+            if index == 0:
+                print(f"Saving log for {pod.metadata.name}")
+                metrics = self.adapter.get_metric_events(pod, log_file)
+
+        except client.exceptions.ApiException as e:
+            print(f"Error getting logs: {e}")
+        return metrics
 
     def create_step(self, jobid):
         """
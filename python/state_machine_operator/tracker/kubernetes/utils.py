@@ -1,6 +1,9 @@
+import codecs
 import os
 
-from kubernetes import client
+import state_machine_operator.defaults as defaults
+
+from .api import get_core_api
 
 
 def get_namespace():
@@ -13,11 +16,103 @@ def get_namespace():
             return f.read().strip()
 
 
+def get_label_selector(workflow=None, unlabeled=False):
+    """
+    Get a label selector to scope jobs to a workflow, if provided.
+
+    If unlabeled is true, select jobs without the workflow label instead,
+    which were created before jobs were labeled.
+    """
+    if workflow is None:
+        return
+    if unlabeled:
+        return f"!{defaults.workflow_label}"
+    return f"{defaults.workflow_label}={workflow}"
+
+
+def in_workflow(job, workflow=None):
+    """
+    Determine if a job (V1Job) belongs to a workflow, or is unlabeled.
+    """
+    if workflow is None:
+        return True
+    value = (job.metadata.labels or {}).get(defaults.workflow_label)
+    return value is None or value == workflow
+
+
+def stream_pod_log(pod, chunk_size=None, **kwargs):
+    """
+    Stream a pod log in chunks (bytes), without reading it all into memory.
+
+    Additional arguments (e.g., tail_lines, limit_bytes) are passed to the API.
+    """
+    api = get_core_api()
+    response = api.read_namespaced_pod_log(
+        name=pod.metadata.name,
+        namespace=pod.metadata.namespace,
+        follow=False,
+        timestamps=True,
+        _preload_content=False,
+        **kwargs,
+    )
+    try:
+        yield from response.stream(chunk_size or defaults.log_chunk_size)
+    except GeneratorExit:
+        # We stopped early (e.g., a parser is done) so the connection is not reusable
+        response.close()
+        raise
+    finally:
+        response.release_conn()
+
+
+def iter_lines(chunks):
+    """
+    Iterate over lines from a stream of chunks (bytes).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    partial = ""
+    for chunk in chunks:
+        # The last line may continue in the next chunk
+        *lines, partial = (partial + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    partial += decoder.decode(b"", final=True)
+    if partial:
+        yield partial
+
+
+def get_completion_index(pod):
+    """
+    Get the completion index of a pod for an Indexed job (e.g., a JobSet), if defined.
+    """
+    key = "batch.kubernetes.io/job-completion-index"
+    index = (pod.metadata.labels or {}).get(key) or (pod.metadata.annotations or {}).get(key)
+    if index is not None:
+        return int(index)
+
+
+def sort_pods(pods):
+    """
+    Sort pods so the lead pod is first.
+
+    Pods for an Indexed job are sorted by completion index, and otherwise
+    we sort by creation time (then name), so the order does not depend on
+    the order of the listing.
+    """
+
+    def sort_key(pod):
+        index = get_completion_index(pod)
+        created = pod.metadata.creation_timestamp
+        return (index is None, index or 0, created is None, created or 0, pod.metadata.name)
+
+    return sorted(pods, key=sort_key)
+
+
 def get_manager_pod():
     """
     Get the currently running manager pod.
     """
-    v1 = client.CoreV1Api()
+    v1 = get_core_api()
 
     # Get the manager pod
     label_selector = "component=state-machine-manager"
@@ -3,9 +3,10 @@ import json
 import logging
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import state_machine_operator.utils as utils
-from state_machine_operator.tracker.types import SubmissionCode
+from state_machine_operator.tracker.types import JobSubmission, SubmissionCode
 
 # Print debug for now
 logging.basicConfig(level=logging.INFO)
@@ -99,9 +100,6 @@ class BaseTracker:
         self.workflow = workflow
         self.check_resources()
 
-        # We retrieve custom metrics from the log and deliver to the manager
-        self.metrics = []
-
     @property
     def total_nodes(self):
         return self.workflow.get("cluster", {}).get("max_nodes") or 1
@@ -163,6 +161,8 @@ class BaseTracker:
     def save_log(self, job=None):
         """
         Save a log for a job to a user-specified location.
+
+        Custom metrics parsed from the log are returned for the state machine.
         """
         pass
 
@@ -212,7 +212,36 @@ class BaseTracker:
         step = self.create_step(jobid)
         LOGGER.debug(f"[{self.type}] submitting job {jobid}")
         submit_record = self.adapter.submit(step, jobid, repeat=repeat)
+        return self.check_submission(step, jobid, submit_record)
+
+    def submit_jobs(self, jobids, workers=None):
+        """
+        Submit a batch of jobs to a tracker adapter.
 
+        All steps are prepared first, and then submit concurrently through
+        a bounded pool of workers. We yield the jobid and submit record for
+        each job as it completes.
+        """
+        steps = {jobid: self.create_step(jobid) for jobid in jobids}
+        LOGGER.debug(f"[{self.type}] submitting {len(steps)} jobs")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.adapter.submit, step, jobid): jobid
+                for jobid, step in steps.items()
+            }
+            for future in as_completed(futures):
+                jobid = futures[future]
+                try:
+                    submit_record = future.result()
+                except Exception as e:
+                    LOGGER.error(f"[{self.type}] Error submitting job {jobid}: {e}")
+                    submit_record = JobSubmission(SubmissionCode.ERROR, -1)
+                yield jobid, self.check_submission(steps[jobid], jobid, submit_record)
+
+    def check_submission(self, step, jobid, submit_record):
+        """
+        Check the submit record for a job, and cleanup on failure.
+        """
         # A conflcit means the job is already running. We don't want to count
         # it as a new submit (it will already be represented in the state)
         if submit_record.status == SubmissionCode.CONFLICT:
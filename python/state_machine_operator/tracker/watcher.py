@@ -5,9 +5,10 @@ class Watcher:
     expose the same (empty) interface.
     """
 
-    def __init__(self):
-        # Any watcher can provide custom metrics
+    def __init__(self, events=None):
+        # Any watcher can provide custom metrics, and record to an event log
         self.metrics = []
+        self.events = events
 
     def start(self):
         pass
@@ -32,6 +32,24 @@ def read_file(filename):
     return content
 
 
+def read_lines(filename):
+    """
+    Iterate over the lines of a file, without reading it all into memory.
+    """
+    with open(filename, "r", errors="replace") as fd:
+        yield from fd
+
+
+def read_jsonl(filename):
+    """
+    Iterate over json objects in a file (one per line), without reading it all into memory.
+    """
+    for line in read_lines(filename):
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
 def write_file(content, filename):
     with open(filename, "w") as fd:
         fd.write(content)